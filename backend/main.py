@@ -1,11 +1,72 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Dict
-from src.algorithms.utils import Location, LocationDetail
-from src.algorithms.algorithms import genetic_algorithm, simulated_annealing, particle_swarm_optimization, ant_colony_optimization, tabu_search, differential_evolution, artificial_bee_colony, hybrid_aco_tabu, modified_abc
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from src.models import OptimizationRequest, OptimizationResponse, JobStatus, CacheStats, BatchRequest, BatchItemResult, LayoutRequest, LayoutInfo
+from src.optimizer import run_optimization, warm_up, dispatch_algorithm
+from src.algorithms.algorithms import CONSTRUCTIVE_HEURISTICS, EXACT_MAX_PICKS, BNB_MAX_PICKS
+from src.jobs import Job, JobStore
+from src.cache import ResultCache, cache_key
+from src.portfolio import race_members, run_race
+from src.islands import island_settings, run_islands
+from src.layouts import LayoutStore, resolve_picks
 
-app = FastAPI(title="Warehouse Robot Optimizer API")
+# Number of solver processes, defaults to one per CPU core
+OPTIMIZER_WORKERS = int(os.environ.get("OPTIMIZER_WORKERS", os.cpu_count() or 1))
+
+# How many jobs, and for how long finished jobs, are kept for polling
+JOB_RETENTION = int(os.environ.get("JOB_RETENTION", 1000))
+JOB_TTL_SECONDS = float(os.environ.get("JOB_TTL_SECONDS", 3600))
+
+# Cached /optimize results, how many and for how long
+CACHE_SIZE = int(os.environ.get("CACHE_SIZE", 256))
+CACHE_TTL_SECONDS = float(os.environ.get("CACHE_TTL_SECONDS", 300))
+
+# Results of runs cut short by the clock or a cancel depend on server load, they are never cached
+UNCACHED_TERMINATIONS = {"deadline", "timeLimit", "cancelled"}
+
+# How often a stream checks the worker for new incumbents
+STREAM_POLL_SECONDS = 0.05
+
+# Most requests accepted in one POST /optimize/batch
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", 1000))
+
+# Largest registered layout in slots
+LAYOUT_MAX_SLOTS = int(os.environ.get("LAYOUT_MAX_SLOTS", 10000))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Solvers are CPU-bound, run them in worker processes so the event loop stays responsive
+    context = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(max_workers=OPTIMIZER_WORKERS, mp_context=context)
+
+    # Shares job progress and cancellation flags with the worker processes
+    manager = context.Manager()
+
+    # Pre-start every worker so the first requests do not pay for process startup
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(loop.run_in_executor(pool, warm_up) for _ in range(OPTIMIZER_WORKERS)))
+
+    app.state.pool = pool
+    app.state.manager = manager
+    app.state.jobs = JobStore(max_jobs=JOB_RETENTION, ttl_seconds=JOB_TTL_SECONDS)
+    app.state.cache = ResultCache(max_entries=CACHE_SIZE, ttl_seconds=CACHE_TTL_SECONDS)
+    app.state.layouts = LayoutStore(max_slots=LAYOUT_MAX_SLOTS)
+    yield
+    pool.shutdown(wait=False, cancel_futures=True)
+    manager.shutdown()
+
+
+app = FastAPI(title="Warehouse Robot Optimizer API", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -15,24 +76,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-class OptimizationRequest(BaseModel):
-    locations: List[Location]
-    algorithm: str = "GA"
-
-class OptimizationResponse(BaseModel):
-    route: List[str]
-    coordinates: List[List[float]]
-    totalDistance: float
-    totalLoadingTime: float
-    totalPenalty: float
-    grandTotalCost: float
-    routeSequence: List[str]
-    penalties: Dict[str, float]
-    algorithmUsed: str
-    locationDetails: List[LocationDetail]
-    evaluationsUsed: int
-
-from src.algorithms.utils import calculate_route_cost
 
 @app.get("/")
 def read_root():
@@ -42,70 +85,279 @@ def read_root():
         "algorithms": ["GA", "SA", "PSO", "ACO", "HYBRID"]
     }
 
+def validate_request(request: OptimizationRequest):
+    if request.pick_count < 2:
+        raise HTTPException(status_code=400, detail="At least 2 locations required")
+    if request.algorithm == "EXACT" and request.pick_count > EXACT_MAX_PICKS:
+        raise HTTPException(status_code=400, detail=f"EXACT supports at most {EXACT_MAX_PICKS} locations")
+    if request.algorithm == "BNB" and request.pick_count > BNB_MAX_PICKS:
+        raise HTTPException(status_code=400, detail=f"BNB supports at most {BNB_MAX_PICKS} locations")
+    for code in request.constructiveSeeds or []:
+        if code.upper() not in CONSTRUCTIVE_HEURISTICS:
+            raise HTTPException(status_code=400, detail=f"Unknown constructive heuristic: {code}")
+    try:
+        if request.algorithm == "RACE":
+            race_members(request)
+        elif request.algorithm == "ISLAND":
+            island_settings(request, OPTIMIZER_WORKERS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def prepare_request(request: OptimizationRequest) -> OptimizationRequest:
+    """Upper-case the algorithm code, resolve picks on a registered layout and validate the request"""
+    request = request.model_copy(update={"algorithm": request.algorithm.upper()})
+    if request.layoutId is not None or request.picks is not None:
+        if request.layoutId is None:
+            raise HTTPException(status_code=400, detail="picks require a layoutId")
+        layout = app.state.layouts.get(request.layoutId)
+        if layout is None:
+            raise HTTPException(status_code=404, detail="Layout not found")
+        try:
+            request = resolve_picks(request, layout)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    validate_request(request)
+    return request
+
+async def solve(request: OptimizationRequest, progress=None, cancel_event=None, incumbents=None) -> OptimizationResponse:
+    """
+    Run one solver in the worker pool, race several when algorithm is RACE or
+    spread an island-model GA over the workers when algorithm is ISLAND.
+    timeLimitMs counts from now, so time spent waiting for a free worker is included.
+    Small pick lists are solved exactly instead, see dispatch_algorithm.
+    """
+    request = request.model_copy(update={"algorithm": dispatch_algorithm(request)})
+    deadline = time.time() + request.timeLimitMs / 1000 if request.timeLimitMs is not None else None
+
+    if request.algorithm == "RACE":
+        return await run_race(request, app.state.pool, app.state.manager, progress, cancel_event, incumbents, deadline)
+    if request.algorithm == "ISLAND":
+        return await run_islands(request, app.state.pool, app.state.manager, OPTIMIZER_WORKERS,
+                                 progress, cancel_event, incumbents, deadline)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(app.state.pool, run_optimization, request, progress, cancel_event,
+                                      incumbents, deadline)
+
+async def solve_cached(request: OptimizationRequest) -> OptimizationResponse:
+    """
+    Validate and solve a request, answering repeated ones from the result cache unless useCache is false.
+    Runs cut short by the clock or cancelled are not cached.
+    """
+    request = prepare_request(request)
+
+    cache = app.state.cache
+    key = cache_key(request) if request.useCache else None
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    result = await solve(request)
+    if key is not None and result.terminationReason not in UNCACHED_TERMINATIONS:
+        cache.put(key, result)
+    return result
+
 @app.post("/optimize", response_model=OptimizationResponse)
 async def optimize_route(request: OptimizationRequest):
     """
     Optimize warehouse robot route based on locations and algorithm.
     Robot travels at 1 unit/min and must return to (0,0).
+    Repeated requests are answered from the result cache unless useCache is false.
     """
     try:
-        if len(request.locations) < 2:
-            raise HTTPException(status_code=400, detail="At least 2 locations required")
-
-        if request.algorithm == "GA":
-            best_route, evaluations = genetic_algorithm(request.locations)
-            algorithm_name = "Genetic Algorithm"
-        elif request.algorithm == "SA":
-            best_route, evaluations = simulated_annealing(request.locations)
-            algorithm_name = "Simulated Annealing"
-        elif request.algorithm == "PSO":
-            best_route, evaluations = particle_swarm_optimization(request.locations)
-            algorithm_name = "Particle Swarm Optimization"
-        elif request.algorithm == "ACO":
-            best_route, evaluations = ant_colony_optimization(request.locations)
-            algorithm_name = "Ant Colony Optimization"
-        elif request.algorithm in ["TS", "TABU"]:
-            best_route, evaluations = tabu_search(request.locations)
-            algorithm_name = "Tabu Search"
-        elif request.algorithm == "DE":
-            best_route, evaluations = differential_evolution(request.locations)
-            algorithm_name = "Differential Evolution"
-        elif request.algorithm == "ABC":
-            best_route, evaluations = artificial_bee_colony(request.locations)
-            algorithm_name = "Artificial Bee Colony"
-        elif request.algorithm == "MABC":
-            best_route, evaluations = modified_abc(request.locations)
-            algorithm_name = "Modified Artificial Bee Colony"
-        elif request.algorithm == "HYBRID":
-            best_route, evaluations = hybrid_aco_tabu(request.locations)
-            algorithm_name = "Hybrid (ACO + Tabu Search)"
-        else:
-            # Default to GA for other algorithms
-            best_route, evaluations = genetic_algorithm(request.locations)
-            algorithm_name = request.algorithm
-
-        # Calculate final route metrics
-        result = calculate_route_cost(best_route, request.locations)
-
-        # Build response
-        route_ids = [request.locations[i].id for i in best_route]
-        route_sequence = ["Start (0,0)"] + route_ids + ["Return to Start"]
-
-        return OptimizationResponse(
-            route=route_ids,
-            coordinates=result["coordinates"],
-            totalDistance=round(result["total_distance"], 2),
-            totalLoadingTime=round(result["total_loading_time"], 2),
-            totalPenalty=round(result["total_penalty"], 2),
-            grandTotalCost=round(result["grand_total_cost"], 2),
-            routeSequence=route_sequence,
-            penalties={k: round(v, 2) for k, v in result["penalties"].items()},
-            algorithmUsed=algorithm_name,
-            locationDetails=result["location_details"],
-            evaluationsUsed=evaluations
-        )
-
+        return await solve_cached(request)
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Optimization failed: {str(e)}")
+
+
+@app.get("/cache", response_model=CacheStats)
+async def get_cache_stats():
+    """Size and hit/miss counters of the /optimize result cache"""
+    return app.state.cache.stats()
+
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/optimize/stream")
+async def optimize_route_stream(request: OptimizationRequest):
+    """
+    Optimize like POST /optimize but stream Server-Sent Events: an "incumbent"
+    event for every new best route (throttled in the solver) and a final
+    "result" event with the full response, or an "error" event.
+    Disconnecting stops the solver.
+    """
+    request = prepare_request(request)
+
+    manager = app.state.manager
+    incumbents = manager.Queue()
+    cancel_event = manager.Event()
+    future = asyncio.ensure_future(solve(request, cancel_event=cancel_event, incumbents=incumbents))
+    best_cost = float('inf')
+
+    def drain():
+        # Race members share the queue, only forward routes that beat every earlier one
+        nonlocal best_cost
+        events = []
+        while True:
+            try:
+                incumbent = incumbents.get_nowait()
+            except queue.Empty:
+                return events
+            if incumbent["grandTotalCost"] < best_cost:
+                best_cost = incumbent["grandTotalCost"]
+                events.append(sse_event("incumbent", incumbent))
+
+    async def events():
+        try:
+            while not future.done():
+                for event in drain():
+                    yield event
+                await asyncio.wait({future}, timeout=STREAM_POLL_SECONDS)
+
+            # The worker flushes its last incumbent before returning
+            for event in drain():
+                yield event
+            try:
+                result = future.result()
+            except Exception as e:
+                yield sse_event("error", {"detail": f"Optimization failed: {str(e)}"})
+            else:
+                yield sse_event("result", result.model_dump())
+        finally:
+            if not future.done():
+                cancel_event.set()
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+async def run_batch_item(index: int, item, defaults: dict, slots: asyncio.Semaphore) -> BatchItemResult:
+    """Validate and solve one item of a batch, turning any failure into an error entry"""
+    try:
+        request = OptimizationRequest.model_validate({**defaults, **item} if isinstance(item, dict) else item)
+    except ValidationError as e:
+        detail = "; ".join(": ".join(filter(None, [".".join(str(part) for part in error["loc"]), error["msg"]]))
+                           for error in e.errors())
+        return BatchItemResult(index=index, status=422, error=detail)
+
+    # Wait for a free worker first, so the item's timeLimitMs only counts its own solve
+    async with slots:
+        try:
+            result = await solve_cached(request)
+        except HTTPException as e:
+            return BatchItemResult(index=index, status=e.status_code, error=str(e.detail))
+        except ValueError as e:
+            return BatchItemResult(index=index, status=400, error=str(e))
+        except Exception as e:
+            return BatchItemResult(index=index, status=500, error=f"Optimization failed: {str(e)}")
+    return BatchItemResult(index=index, result=result)
+
+@app.post("/optimize/batch")
+async def optimize_batch(batch: BatchRequest):
+    """
+    Optimize many independent pick lists in one call. Items run concurrently,
+    one per worker process, and each result is streamed as a line of NDJSON as
+    soon as it is ready, in completion order and tagged with its index.
+    A failing item yields an error line and does not affect the others.
+    Disconnecting drops the items that have not started yet.
+    """
+    if len(batch.requests) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"A batch holds at most {BATCH_MAX_ITEMS} requests")
+
+    defaults = {"maxEvaluations": batch.maxEvaluations, "timeLimitMs": batch.timeLimitMs}
+    defaults = {key: value for key, value in defaults.items() if value is not None}
+    slots = asyncio.Semaphore(OPTIMIZER_WORKERS)
+    tasks = [asyncio.ensure_future(run_batch_item(index, item, defaults, slots))
+             for index, item in enumerate(batch.requests)]
+
+    async def lines():
+        try:
+            for finished in asyncio.as_completed(tasks):
+                item = await finished
+                yield item.model_dump_json() + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+async def run_job(job: Job):
+    """Run a job in the worker pool and record its outcome"""
+    job.state = "running"
+    try:
+        result = await solve(job.request, job.progress, job.cancel_event)
+        job.finish("cancelled" if job.cancel_event.is_set() else "completed", result=result)
+    except Exception as e:
+        job.finish("failed", error=str(e))
+
+@app.post("/jobs", response_model=JobStatus, status_code=202)
+async def create_job(request: OptimizationRequest):
+    """
+    Start an optimization in the background and return its job id immediately.
+    Poll GET /jobs/{id} for progress and the final result.
+    """
+    request = prepare_request(request)
+
+    manager = app.state.manager
+    job = Job(request, progress=manager.dict(), cancel_event=manager.Event())
+    app.state.jobs.add(job)
+    job.task = asyncio.create_task(run_job(job))
+    return job.status()
+
+def get_job_or_404(job_id: str) -> Job:
+    job = app.state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """State, evaluations used, best cost so far and, once finished, the final result"""
+    return get_job_or_404(job_id).status()
+
+@app.delete("/jobs/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str):
+    """
+    Ask a running job to stop. The solver finishes its current step and the job
+    ends as "cancelled" with the best route found so far.
+    """
+    job = get_job_or_404(job_id)
+    if not job.finished:
+        job.cancel_event.set()
+    return job.status()
+
+
+def get_layout_or_404(layout_id: str):
+    layout = app.state.layouts.get(layout_id)
+    if layout is None:
+        raise HTTPException(status_code=404, detail="Layout not found")
+    return layout
+
+@app.put("/layouts/{layout_id}", response_model=LayoutInfo)
+async def put_layout(layout_id: str, upload: LayoutRequest):
+    """
+    Register or replace a warehouse layout. Pick requests then send layoutId
+    and picks with slot ids instead of full locations.
+    """
+    try:
+        return app.state.layouts.put(layout_id, upload).info()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/layouts/{layout_id}", response_model=LayoutInfo)
+async def get_layout(layout_id: str):
+    return get_layout_or_404(layout_id).info()
+
+@app.delete("/layouts/{layout_id}", response_model=LayoutInfo)
+async def delete_layout(layout_id: str):
+    """Forget a layout, requests already running on it are not affected"""
+    layout = get_layout_or_404(layout_id)
+    app.state.layouts.delete(layout_id)
+    return layout.info()
@@ -0,0 +1,76 @@
+"""
+Vectorized ant system shared by the ACO-based algorithms
+"""
+from typing import List
+import numpy as np
+from .instance import ProblemInstance
+
+
+class AntColony:
+    """
+    Pheromone matrix plus the precomputed heuristic matrix eta**beta.
+    A whole colony builds its routes in lock-step: at every step each ant's
+    probability row is masked by the picks it already visited and the next
+    picks of all ants are drawn with one vectorized roulette wheel.
+    """
+
+    def __init__(self, instance: ProblemInstance, alpha: float, beta: float, rho: float, q: float,
+                 initial_pheromone: float = 1.0):
+        self.instance = instance
+        self.alpha = alpha
+        self.rho = rho
+        self.q = q
+        self.pheromones = np.full((instance.n, instance.n), initial_pheromone)
+
+        # Coinciding picks get no heuristic weight, like an unreachable edge
+        distances = instance.distances
+        with np.errstate(divide="ignore"):
+            self.heuristic = np.where(distances > 0, distances ** -beta, 0.0)
+
+    def construct(self, num_ants: int, rng: np.random.Generator) -> np.ndarray:
+        """Build num_ants routes from random starting picks, returned as a (num_ants x n) array"""
+        n = self.instance.n
+        ants = np.arange(num_ants)
+        routes = np.empty((num_ants, n), dtype=np.intp)
+        unvisited = np.ones((num_ants, n))
+
+        current = rng.integers(n, size=num_ants)
+        routes[:, 0] = current
+        unvisited[ants, current] = 0.0
+
+        # Pheromones do not change while the colony is out, weigh every edge once
+        attractiveness = self.pheromones ** self.alpha * self.heuristic
+
+        for step in range(1, n):
+            weights = attractiveness[current]
+            weights *= unvisited
+            cumulative = np.cumsum(weights, axis=1)
+
+            # Ants left with only zero-weight picks choose uniformly among them
+            stuck = cumulative[:, -1] <= 0
+            if stuck.any():
+                cumulative[stuck] = np.cumsum(unvisited[stuck], axis=1)
+
+            # Roulette wheel: first pick whose cumulative weight reaches a uniform draw in (0, total]
+            draws = (1.0 - rng.random(num_ants)) * cumulative[:, -1]
+            current = np.argmax(cumulative >= draws[:, None], axis=1)
+
+            routes[:, step] = current
+            unvisited[ants, current] = 0.0
+
+        return routes
+
+    def evaporate(self):
+        self.pheromones *= 1.0 - self.rho
+
+    def deposit(self, routes: np.ndarray, costs: np.ndarray):
+        """Every ant lays q / cost on each edge of its tour, including the one closing it"""
+        routes = np.asarray(routes, dtype=np.intp)
+        amounts = np.where(costs > 0, self.q / np.where(costs > 0, costs, 1.0), 0.0)
+        np.add.at(self.pheromones, (routes, np.roll(routes, -1, axis=1)),
+                  np.broadcast_to(amounts[:, None], routes.shape))
+
+    def reinforce(self, route: List[int], amount: float):
+        """Add pheromone along a given route, used to bias the colony towards warm-start routes"""
+        route = np.asarray(route, dtype=np.intp)
+        self.pheromones[route[:-1], route[1:]] += amount
@@ -9,4 +9,9 @@ from .tabu_search import tabu_search
 from .differential_evolution import differential_evolution
 from .artificial_bee_colony import artificial_bee_colony
 from .hybrid_aco_tabu import hybrid_aco_tabu
-from .modified_abc import modified_abc
\ No newline at end of file
+from .max_min_ant_system import max_min_ant_system
+from .modified_abc import modified_abc
+from .incremental import incremental_repair
+from .held_karp import held_karp, EXACT_MAX_PICKS
+from .branch_and_bound import branch_and_bound, BNB_MAX_PICKS
+from .constructive import CONSTRUCTIVE_HEURISTICS, constructive_solver
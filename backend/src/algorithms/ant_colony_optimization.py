@@ -1,12 +1,16 @@
 """
 Ant Colony Optimization for warehouse robot route optimization
 """
-from typing import List
-import random
-from .utils import Location, calculate_route_cost, calculate_distance
+from typing import List, Optional
+import numpy as np
+from .instance import ProblemInstance
+from .monitor import SearchMonitor
+from .utils import route_cost, batch_route_cost
+from .aco_core import AntColony
 
 
-def ant_colony_optimization(locations: List[Location], max_evaluations: int = 10000) -> tuple:
+def ant_colony_optimization(instance: ProblemInstance, max_evaluations: int = 10000, monitor: SearchMonitor = None,
+                            initial_routes: List[List[int]] = None, seed: Optional[int] = None) -> tuple:
     """
     Ant Colony Optimization for TSP optimization
     Uses pheromone trails to guide search
@@ -17,115 +21,49 @@ def ant_colony_optimization(locations: List[Location], max_evaluations: int = 10
     BETA = 2.0   # Distance importance
     RHO = 0.1    # Pheromone evaporation rate
     Q = 100.0    # Pheromone constant
+    WARM_START_BIAS = 1.0  # Extra initial pheromone on the edges of warm-start routes
 
-    n = len(locations)
+    n = instance.n
     evaluations = 0
+    monitor = monitor or SearchMonitor()
+    rng = np.random.default_rng(seed)
 
-    # Initialize pheromone matrix
-    pheromones = [[1.0 for _ in range(n)] for _ in range(n)]
-
-    # Calculate distances between all locations
-    distances = [[0.0 for _ in range(n)] for _ in range(n)]
-    for i in range(n):
-        for j in range(n):
-            if i != j:
-                distances[i][j] = calculate_distance(
-                    locations[i].x, locations[i].y,
-                    locations[j].x, locations[j].y
-                )
-
-    # Function to build a route for an ant using probability
-    def build_route():
-        route = []
-        unvisited = set(range(n))
-        current = random.choice(list(unvisited))
-
-        route.append(current)
-        unvisited.remove(current)
-
-        while unvisited:
-            # Calculate probabilities for next location
-            probabilities = []
-            total = 0.0
-
-            for next_loc in unvisited:
-                if distances[current][next_loc] > 0:
-                    prob = (pheromones[current][next_loc] ** ALPHA) * \
-                           ((1.0 / distances[current][next_loc]) ** BETA)
-                    probabilities.append((next_loc, prob))
-                    total += prob
-                else:
-                    probabilities.append((next_loc, 0.0))
-
-            # Select next location based on probabilities
-            if total > 0:
-                rand = random.random() * total
-                cumulative = 0.0
-                selected = None
-                for next_loc, prob in probabilities:
-                    cumulative += prob
-                    if rand <= cumulative:
-                        selected = next_loc
-                        break
-
-                if selected is None:
-                    # Fallback: pick random unvisited location
-                    selected = random.choice(list(unvisited))
-            else:
-                # If all probabilities are zero, pick random
-                selected = random.choice(list(unvisited))
-
-            route.append(selected)
-            unvisited.remove(selected)
-            current = selected
-
-        return route
+    # Pheromone and heuristic matrices, ants are built all at once
+    colony = AntColony(instance, ALPHA, BETA, RHO, Q)
 
     # Initialize best solution
-    best_route = list(range(n))
-    random.shuffle(best_route)
+    best_route = rng.permutation(n).tolist()
     best_cost = float('inf')
 
+    # Warm start: bias the trails towards the given routes and start from the best of them
+    for route in initial_routes or []:
+        colony.reinforce(route, WARM_START_BIAS)
+        cost = route_cost(route, instance)
+        evaluations += 1
+        if cost < best_cost:
+            best_cost = cost
+            best_route = list(route)
+            monitor.improved(best_route, best_cost, evaluations)
+
     # ACO main loop
     iteration = 0
-    while iteration < MAX_ITERATIONS and evaluations < max_evaluations:
+    while iteration < MAX_ITERATIONS and evaluations < max_evaluations and not monitor.should_stop(evaluations):
         iteration += 1
 
         # Generate solutions for all ants
-        ant_routes = []
-        ant_costs = []
-
-        for _ in range(NUM_ANTS):
-            if evaluations >= max_evaluations:
-                break
+        ant_routes = colony.construct(min(NUM_ANTS, max_evaluations - evaluations), rng)
+        ant_costs = batch_route_cost(ant_routes, instance)
+        evaluations += len(ant_routes)
 
-            route = build_route()
-            result = calculate_route_cost(route, locations)
-            cost = result["grand_total_cost"]
-
-            evaluations += 1
-            ant_routes.append(route)
-            ant_costs.append(cost)
-
-            # Update best solution if found
-            if cost < best_cost:
-                best_cost = cost
-                best_route = route[:]
+        # Update best solution if found
+        best_ant = int(np.argmin(ant_costs))
+        if ant_costs[best_ant] < best_cost:
+            best_cost = float(ant_costs[best_ant])
+            best_route = ant_routes[best_ant].tolist()
+            monitor.improved(best_route, best_cost, evaluations)
 
         # Update pheromones
-        # Evaporate pheromones
-        for i in range(n):
-            for j in range(n):
-                if i != j:
-                    pheromones[i][j] *= (1.0 - RHO)
-
-        # Deposit pheromones for each ant
-        for route, cost in zip(ant_routes, ant_costs):
-            if cost > 0:  # Avoid division by zero
-                pheromone_deposit = Q / cost
-                for i in range(len(route)):
-                    from_loc = route[i]
-                    to_loc = route[(i + 1) % len(route)]  # Return to start
-                    pheromones[from_loc][to_loc] += pheromone_deposit
+        colony.evaporate()
+        colony.deposit(ant_routes, ant_costs)
 
-    return best_route, evaluations
\ No newline at end of file
+    return best_route, evaluations
@@ -1,12 +1,16 @@
 """
 Artificial Bee Colony for warehouse robot route optimization
 """
-from typing import List
+from typing import List, Optional
 import random
-from .utils import Location, calculate_route_cost
+from .instance import ProblemInstance
+from .monitor import SearchMonitor
+from .utils import seed_routes
+from .fitness_memo import FitnessMemo
 
 
-def artificial_bee_colony(locations: List[Location], max_evaluations: int = 10000) -> tuple:
+def artificial_bee_colony(instance: ProblemInstance, max_evaluations: int = 10000, monitor: SearchMonitor = None,
+                          initial_routes: List[List[int]] = None, seed: Optional[int] = None) -> tuple:
     """
     Artificial Bee Colony for TSP optimization
     Simulates the foraging behavior of honey bees
@@ -15,68 +19,71 @@ def artificial_bee_colony(locations: List[Location], max_evaluations: int = 1000
     MAX_GENERATIONS = 500
     LIMIT = 100  # Limit for abandoning a food source (solution)
 
-    n = len(locations)
+    n = instance.n
     evaluations = 0
+    monitor = monitor or SearchMonitor()
+    rng = random.Random(seed)
+    memo = FitnessMemo(instance)
 
     # Function to create a random route (permutation)
     def create_random_route():
         route = list(range(n))
-        random.shuffle(route)
+        rng.shuffle(route)
         return route
 
-    # Function to generate a neighbor solution (using swap mutation)
-    def generate_neighbor_solution(base_route):
+    # Function to generate a neighbor solution (using swap mutation) and its memo hash
+    def generate_neighbor_solution(base_route, base_hash):
         neighbor = base_route[:]
+        neighbor_hash = base_hash
         # Perform random swaps to create a neighbor
-        num_swaps = random.randint(1, 3)  # Random number of swaps
+        num_swaps = rng.randint(1, 3)  # Random number of swaps
         for _ in range(num_swaps):
-            i, j = random.sample(range(len(neighbor)), 2)
+            i, j = rng.sample(range(len(neighbor)), 2)
+            neighbor_hash = memo.swap_hash(neighbor_hash, neighbor, i, j)
             neighbor[i], neighbor[j] = neighbor[j], neighbor[i]
-        return neighbor
+        return neighbor, neighbor_hash
+
+    # Score several routes in one vectorized call, looking up routes seen before
+    def evaluate(routes, route_hashes):
+        nonlocal evaluations
+        costs, scored = memo.evaluate(routes, route_hashes)
+        evaluations += scored
+        if costs:
+            best = costs.index(min(costs))
+            monitor.improved(routes[best], costs[best], evaluations)
+        return costs
 
     # Initialize population (food sources)
-    population = []
-    fitnesses = []
-    trial_counts = []  # Count of trials without improvement for each solution
-
-    for _ in range(POPULATION_SIZE):
-        if evaluations >= max_evaluations:
-            break
-        route = create_random_route()
-        population.append(route)
-        result = calculate_route_cost(route, locations)
-        fitness = result["grand_total_cost"]
-        fitnesses.append(fitness)
-        trial_counts.append(0)
-        evaluations += 1
-
-    if evaluations >= max_evaluations:
+    population = seed_routes(initial_routes, min(POPULATION_SIZE, max_evaluations), create_random_route)
+    hashes = memo.hashes(population)
+    fitnesses = evaluate(population, hashes)
+    trial_counts = [0] * len(population)  # Count of trials without improvement for each solution
+
+    if evaluations >= max_evaluations or monitor.should_stop(evaluations):
         best_idx = fitnesses.index(min(fitnesses))
         return population[best_idx], evaluations
 
+    # Greedy selection: keep better solution for each scored neighbor
+    def greedy_update(sources, neighbors, neighbor_hashes, neighbor_fitnesses):
+        for source, neighbor, neighbor_hash, neighbor_fitness in zip(sources, neighbors, neighbor_hashes,
+                                                                     neighbor_fitnesses):
+            if neighbor_fitness < fitnesses[source]:
+                population[source] = neighbor
+                hashes[source] = neighbor_hash
+                fitnesses[source] = neighbor_fitness
+                trial_counts[source] = 0  # Reset trial count
+            else:
+                trial_counts[source] += 1  # Increment trial count
+
     # ABC main loop
     generation = 0
-    while generation < MAX_GENERATIONS and evaluations < max_evaluations:
+    while generation < MAX_GENERATIONS and evaluations < max_evaluations and not monitor.should_stop(evaluations):
         generation += 1
 
         # Employed bee phase: each bee searches around its food source
-        for i in range(POPULATION_SIZE):
-            if evaluations >= max_evaluations:
-                break
-
-            # Generate a neighbor solution for employed bee i
-            neighbor = generate_neighbor_solution(population[i])
-            result = calculate_route_cost(neighbor, locations)
-            neighbor_fitness = result["grand_total_cost"]
-            evaluations += 1
-
-            # Greedy selection: keep better solution
-            if neighbor_fitness < fitnesses[i]:
-                population[i] = neighbor
-                fitnesses[i] = neighbor_fitness
-                trial_counts[i] = 0  # Reset trial count
-            else:
-                trial_counts[i] += 1  # Increment trial count
+        employed = list(range(min(len(population), max_evaluations - evaluations)))
+        neighbors, neighbor_hashes = zip(*[generate_neighbor_solution(population[i], hashes[i]) for i in employed])
+        greedy_update(employed, neighbors, neighbor_hashes, evaluate(neighbors, neighbor_hashes))
 
         # Calculate selection probabilities for onlooker bees
         # Convert cost to fitness (lower cost = higher fitness)
@@ -85,17 +92,15 @@ def artificial_bee_colony(locations: List[Location], max_evaluations: int = 1000
 
         if total_fitness == 0:
             # If all solutions have very high cost, assign equal probabilities
-            probabilities = [1.0 / POPULATION_SIZE] * POPULATION_SIZE
+            probabilities = [1.0 / len(population)] * len(population)
         else:
             probabilities = [inv_fit / total_fitness for inv_fit in inverse_fitnesses]
 
         # Onlooker bee phase: probabilistically select food sources and search around them
-        for i in range(POPULATION_SIZE):
-            if evaluations >= max_evaluations:
-                break
-
+        selected_sources = []
+        for i in range(min(POPULATION_SIZE, max_evaluations - evaluations)):
             # Select a food source using roulette wheel selection
-            rand = random.random()
+            rand = rng.random()
             cumulative_prob = 0.0
             selected_source = 0
             for idx, prob in enumerate(probabilities):
@@ -103,31 +108,27 @@ def artificial_bee_colony(locations: List[Location], max_evaluations: int = 1000
                 if rand <= cumulative_prob:
                     selected_source = idx
                     break
-
-            # Generate a neighbor solution for the selected food source
-            neighbor = generate_neighbor_solution(population[selected_source])
-            result = calculate_route_cost(neighbor, locations)
-            neighbor_fitness = result["grand_total_cost"]
-            evaluations += 1
-
-            # Greedy selection: keep better solution
-            if neighbor_fitness < fitnesses[selected_source]:
-                population[selected_source] = neighbor
-                fitnesses[selected_source] = neighbor_fitness
-                trial_counts[selected_source] = 0  # Reset trial count
-            else:
-                trial_counts[selected_source] += 1  # Increment trial count
-
-        # Scout bee phase: abandon poor solutions and generate new ones
-        for i in range(POPULATION_SIZE):
-            if trial_counts[i] >= LIMIT:
-                # Replace with a new random solution
-                new_route = create_random_route()
+            selected_sources.append(selected_source)
+
+        # Generate a neighbor solution for each selected food source
+        if selected_sources:
+            neighbors, neighbor_hashes = zip(*[generate_neighbor_solution(population[source], hashes[source])
+                                               for source in selected_sources])
+            greedy_update(selected_sources, neighbors, neighbor_hashes, evaluate(neighbors, neighbor_hashes))
+
+        # Scout bee phase: abandon poor solutions and generate new ones, never the best one
+        best_source = fitnesses.index(min(fitnesses))
+        abandoned = [i for i in range(len(population)) if trial_counts[i] >= LIMIT and i != best_source]
+        if abandoned:
+            # Replace with new random solutions
+            new_routes = [create_random_route() for _ in abandoned]
+            new_hashes = memo.hashes(new_routes)
+            for i, new_route, new_hash, new_fitness in zip(abandoned, new_routes, new_hashes,
+                                                            evaluate(new_routes, new_hashes)):
                 population[i] = new_route
-                result = calculate_route_cost(new_route, locations)
-                fitnesses[i] = result["grand_total_cost"]
+                hashes[i] = new_hash
+                fitnesses[i] = new_fitness
                 trial_counts[i] = 0
-                evaluations += 1
 
     # Find best solution
     best_idx = fitnesses.index(min(fitnesses))
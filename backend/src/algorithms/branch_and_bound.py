@@ -0,0 +1,169 @@
+"""
+Best-first branch and bound for mid-size warehouse pick lists
+"""
+from typing import List, Optional
+import heapq
+import math
+import time
+import numpy as np
+from .instance import ProblemInstance
+from .monitor import SearchMonitor
+from .hybrid_aco_tabu import hybrid_aco_tabu
+
+# Largest pick list the solver accepts; beyond it the lateness bound stays loose
+# and the gap rarely closes within the tree-search time limit
+BNB_MAX_PICKS = 20
+
+# Default wall-clock cap of the tree search in seconds, on top of the request's own time limit
+TIME_LIMIT_SECONDS = 10.0
+
+# Open prefixes kept in memory; beyond it the least promising half is dropped,
+# and their bounds still cap the proven lower bound
+MAX_OPEN_NODES = 200000
+
+
+def spanning_tree_length(distances: np.ndarray) -> float:
+    """Length of a minimum spanning tree over a full distance matrix (Prim)"""
+    k = len(distances)
+    if k <= 1:
+        return 0.0
+    in_tree = np.zeros(k, dtype=bool)
+    in_tree[0] = True
+    closest = distances[0].copy()
+    closest[0] = np.inf
+    total = 0.0
+    for _ in range(k - 1):
+        v = int(np.argmin(closest))
+        total += closest[v]
+        in_tree[v] = True
+        closest = np.minimum(closest, distances[v])
+        closest[in_tree] = np.inf
+    return total
+
+
+def branch_and_bound(instance: ProblemInstance, max_evaluations: int = 10000, monitor: SearchMonitor = None,
+                     initial_routes: List[List[int]] = None, seed: Optional[int] = None,
+                     time_limit: float = TIME_LIMIT_SECONDS) -> tuple:
+    """
+    Best-first branch and bound over route prefixes
+    Starts from the best route the ACO + Tabu Search hybrid finds within the
+    evaluation budget, then always expands the open prefix with the lowest bound,
+    so that bound is a proven lower bound on every route and is reported through
+    the monitor.
+    A prefix is bounded by its time and penalty plus, for the unvisited picks,
+    their loading time, a minimum spanning tree over them with the cheapest links
+    to the last pick and to the depot, and the lateness of driving straight to each.
+    Stops when the tree is exhausted (the route is optimal), the monitor's gap
+    target is met, or after time_limit seconds with stop reason "timeLimit".
+    """
+    n = instance.n
+    if n > BNB_MAX_PICKS:
+        raise ValueError(f"Branch and bound supports at most {BNB_MAX_PICKS} locations")
+
+    # Incumbent from the metaheuristic, which also applies the request's stop criteria
+    monitor = monitor or SearchMonitor()
+    best_route, evaluations = hybrid_aco_tabu(instance, max_evaluations=max_evaluations, monitor=monitor,
+                                              initial_routes=initial_routes, seed=seed)
+    best_cost = monitor.best_cost
+    if monitor.should_stop(evaluations):
+        return best_route, evaluations
+
+    distances = instance.distances
+    depot_distances = instance.depot_distances
+    loading_time = instance.loading_time
+    penalty_time = instance.penalty_time
+    penalty_rate = instance.penalty_rate
+    picks = np.arange(n)
+    full = (1 << n) - 1
+
+    # Spanning tree lengths of unvisited sets, shared by all prefixes that leave the same picks
+    tree_lengths = {}
+
+    def tree_length(unvisited_mask: int, unvisited: np.ndarray) -> float:
+        length = tree_lengths.get(unvisited_mask)
+        if length is None:
+            length = spanning_tree_length(distances[np.ix_(unvisited, unvisited)])
+            tree_lengths[unvisited_mask] = length
+        return length
+
+    # Pareto fronts of (time, penalty) per (visited, last) so dominated prefixes are skipped
+    fronts = {}
+
+    def dominated(key: int, time_: float, penalty: float) -> bool:
+        front = fronts.setdefault(key, [])
+        if any(t <= time_ and p <= penalty for t, p in front):
+            return True
+        front[:] = [(t, p) for t, p in front if t < time_ or p < penalty]
+        front.append((time_, penalty))
+        return False
+
+    # Open prefixes: (bound, tie breaker, time, penalty, last pick, visited mask, path)
+    # where path is (last pick, parent path) and last is -1 at the depot
+    heap = [(0.0, 0, 0.0, 0.0, -1, 0, None)]
+    pushed = 1
+    dropped_bound = math.inf
+    started = time.monotonic()
+
+    while heap:
+        lower_bound = min(heap[0][0], dropped_bound, best_cost)
+        monitor.bounded(lower_bound)
+        if heap[0][0] >= best_cost or monitor.should_stop(evaluations):
+            break
+        if time.monotonic() - started > time_limit:
+            monitor.stop_reason = "timeLimit"
+            break
+
+        _, _, time_, penalty, last, mask, path = heapq.heappop(heap)
+        unvisited = picks[((full ^ mask) >> picks) & 1 == 1]
+        row = depot_distances if last < 0 else distances[last]
+
+        # All children at once: append pick j of the unvisited ones
+        arrival = time_ + row[unvisited]
+        child_penalty = penalty + np.maximum(arrival - penalty_time[unvisited], 0.0) * penalty_rate[unvisited]
+        child_time = arrival + loading_time[unvisited]
+
+        if len(unvisited) == 1:
+            j = int(unvisited[0])
+            cost = float(child_time[0] + depot_distances[j] + child_penalty[0])
+            evaluations += 1
+            if cost < best_cost:
+                best_cost = cost
+                best_route = []
+                node = (j, path)
+                while node is not None:
+                    best_route.append(node[0])
+                    node = node[1]
+                best_route.reverse()
+                monitor.improved(best_route, best_cost, evaluations)
+            continue
+
+        # Remaining picks after each child: row k of these matrices is child unvisited[k]
+        inner = distances[np.ix_(unvisited, unvisited)]
+        not_self = ~np.eye(len(unvisited), dtype=bool)
+        rest_loading = loading_time[unvisited].sum() - loading_time[unvisited]
+        late = np.maximum(child_time[:, None] + inner - penalty_time[unvisited][None, :], 0.0)
+        rest_lateness = (late * penalty_rate[unvisited][None, :] * not_self).sum(axis=1)
+        links = np.where(not_self, inner, np.inf).min(axis=1) + \
+            np.where(not_self, depot_distances[unvisited][None, :], np.inf).min(axis=1)
+        bounds = child_time + child_penalty + rest_loading + rest_lateness + links
+
+        for k in np.flatnonzero(bounds < best_cost).tolist():
+            j = int(unvisited[k])
+            child_mask = mask | 1 << j
+            rest = unvisited[not_self[k]]
+            bound = float(bounds[k]) + tree_length(full ^ child_mask, rest)
+            if bound >= best_cost or dominated(child_mask * n + j, float(child_time[k]), float(child_penalty[k])):
+                continue
+            heapq.heappush(heap, (bound, pushed, float(child_time[k]), float(child_penalty[k]), j, child_mask,
+                                  (j, path)))
+            pushed += 1
+
+        # Keep memory bounded, remembering the best bound that was given up
+        if len(heap) > MAX_OPEN_NODES:
+            heap.sort()
+            dropped_bound = min(dropped_bound, heap[MAX_OPEN_NODES // 2][0])
+            del heap[MAX_OPEN_NODES // 2:]
+
+    # An exhausted tree proves the incumbent optimal, up to the prefixes that were dropped
+    monitor.bounded(min(heap[0][0] if heap else math.inf, dropped_bound, best_cost))
+    return best_route, evaluations
@@ -0,0 +1,151 @@
+"""
+Constructive heuristics for warehouse robot route optimization
+"""
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from .instance import ProblemInstance
+from .monitor import SearchMonitor
+from .route_state import RouteState
+from .utils import route_cost
+
+
+def nearest_neighbor_route(instance: ProblemInstance) -> List[int]:
+    """
+    Start at the depot and always drive to the closest pick not visited yet.
+    The first unvisited pick on the current pick's candidate list is that pick,
+    all picks are only scanned once the whole list is visited
+    """
+    n = instance.n
+    if n == 0:
+        return []
+    candidates = instance.candidate_lists
+    visited = [False] * n
+    current = int(np.argmin(instance.depot_distances))
+    route = [current]
+    visited[current] = True
+    while len(route) < n:
+        following = next((node for node in candidates[current] if not visited[node]), None)
+        if following is None:
+            following = int(np.argmin(np.where(visited, np.inf, instance.leg_distances(current, np.arange(n)))))
+        current = following
+        route.append(current)
+        visited[current] = True
+    return route
+
+
+def earliest_deadline_route(instance: ProblemInstance) -> List[int]:
+    """Visit picks by penaltyTime, earliest first, closer picks first on ties"""
+    return np.lexsort((instance.depot_distances, instance.penalty_time)).tolist()
+
+
+def insert_picks(state: RouteState, picks: List[int], stop: Optional[Callable[[int], bool]] = None) -> int:
+    """
+    Add picks to the route one by one, each at the position with the lowest
+    grand total cost. Returns the number of candidate positions priced.
+    Once stop(positions priced so far) is true, the remaining picks are
+    appended in earliest-penaltyTime order without pricing any position.
+    """
+    evaluations = 0
+    for k, node in enumerate(picks):
+        if stop is not None and stop(evaluations):
+            rest = sorted(picks[k:], key=lambda pick: state.instance.penalty_time[pick])
+            state.set_route(state.route + rest)
+            break
+        costs = state.insertion_costs(node)
+        evaluations += len(costs)
+        state.apply_insert(node, int(np.argmin(costs)))
+    return evaluations
+
+
+def complete_route(instance: ProblemInstance, route: List[int]) -> List[int]:
+    """Turn a partial route into a full one by cheapest insertion of the missing picks"""
+    on_route = set(route)
+    missing = [node for node in range(instance.n) if node not in on_route]
+    if not route:
+        if not missing:
+            return []
+        route, missing = missing[:1], missing[1:]
+
+    state = RouteState(instance, route)
+    insert_picks(state, missing)
+    return state.route
+
+
+def cheapest_insertion_route(instance: ProblemInstance) -> List[int]:
+    """
+    Penalty-weighted cheapest insertion: picks are inserted by urgency (earliest
+    penaltyTime, highest penaltyRate on ties), each at the position with the
+    lowest grand total cost, so lateness penalties are priced in from the start
+    """
+    order = np.lexsort((-instance.penalty_rate, instance.penalty_time)).tolist()
+    state = RouteState(instance, order[:1])
+    insert_picks(state, order[1:])
+    return state.route
+
+
+def savings_route(instance: ProblemInstance) -> List[int]:
+    """
+    Clarke-Wright savings: start from one depot round trip per pick and keep
+    joining the two chains whose merge saves the most distance into one route
+    """
+    n = instance.n
+    if n < 3:
+        return list(range(n))
+
+    saving = instance.depot_distances[:, None] + instance.depot_distances[None, :] - instance.distances
+    first, second = np.triu_indices(n, 1)
+    order = np.argsort(-saving[first, second], kind="stable")
+
+    neighbours = [[] for _ in range(n)]
+    chain = list(range(n))  # Union-find of the chains built so far
+
+    def find(node):
+        while chain[node] != node:
+            chain[node] = chain[chain[node]]
+            node = chain[node]
+        return node
+
+    links = 0
+    for i, j in zip(first[order].tolist(), second[order].tolist()):
+        # Only chain ends can be joined, and never two ends of the same chain
+        if len(neighbours[i]) < 2 and len(neighbours[j]) < 2:
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                chain[root_i] = root_j
+                neighbours[i].append(j)
+                neighbours[j].append(i)
+                links += 1
+                if links == n - 1:
+                    break
+
+    # Walk the single remaining chain from one of its ends
+    previous, current = -1, next(node for node in range(n) if len(neighbours[node]) < 2)
+    route = [current]
+    while len(route) < n:
+        previous, current = current, next(node for node in neighbours[current] if node != previous)
+        route.append(current)
+
+    # Savings ignore penalties, drive the chain in its cheaper direction
+    reverse = route[::-1]
+    return route if route_cost(route, instance) <= route_cost(reverse, instance) else reverse
+
+
+# Heuristic code -> route construction
+CONSTRUCTIVE_HEURISTICS: Dict[str, Callable[[ProblemInstance], List[int]]] = {
+    "NN": nearest_neighbor_route,
+    "EDF": earliest_deadline_route,
+    "INSERTION": cheapest_insertion_route,
+    "SAVINGS": savings_route,
+}
+
+
+def constructive_solver(construct: Callable[[ProblemInstance], List[int]]):
+    """Wrap a route construction as a solver with the common signature"""
+    def solver(instance: ProblemInstance, max_evaluations: int = 10000, monitor: SearchMonitor = None,
+               initial_routes: List[List[int]] = None, seed: Optional[int] = None) -> tuple:
+        monitor = monitor or SearchMonitor()
+        route = construct(instance)
+        monitor.improved(route, route_cost(route, instance), 1)
+        return route, 1
+
+    return solver
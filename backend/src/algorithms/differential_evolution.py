@@ -1,159 +1,113 @@
 """
 Differential Evolution for warehouse robot route optimization
 """
-from typing import List
-import random
-from .utils import Location, calculate_route_cost
+from typing import List, Optional
+from .instance import ProblemInstance
+from .monitor import SearchMonitor
+from .utils import seed_routes
+from .fitness_memo import FitnessMemo
+from .permutation_ops import differential_mutation, swap_crossover
+import numpy as np
 
 
-def differential_evolution(locations: List[Location], max_evaluations: int = 10000) -> tuple:
+def differential_evolution(instance: ProblemInstance, max_evaluations: int = 10000, monitor: SearchMonitor = None,
+                           initial_routes: List[List[int]] = None, seed: Optional[int] = None) -> tuple:
     """
     Differential Evolution for TSP optimization
-    Uses vector operations to guide search in discrete space
+    Differences between routes are swap sequences, so mutation and crossover
+    never produce an invalid permutation
     """
     POPULATION_SIZE = 30
     MAX_GENERATIONS = 500
-    F = 0.8  # Differential weight
+    F = 0.3  # Differential weight, the share of swaps of a difference that is applied
     CR = 0.7  # Crossover probability
+    IDLE_LIMIT = 50  # Generations in a row without a new route before the search space counts as exhausted
 
-    n = len(locations)
+    n = instance.n
     evaluations = 0
+    monitor = monitor or SearchMonitor()
+    rng = np.random.default_rng(seed)
+    memo = FitnessMemo(instance)
 
     # Function to create a random route (permutation)
     def create_random_route():
-        route = list(range(n))
-        random.shuffle(route)
-        return route
-
-    # Function to perform crossover operation adapted for permutations
-    def crossover(target, mutant):
-        # For permutations, we use order-based crossover (OX) approach
-        if random.random() > CR:
-            return target[:]  # Return target if no crossover
-
-        # Create a trial vector using a crossover-like approach
-        trial = target[:]
-        # Randomly select some positions to take from mutant
-        for i in range(len(trial)):
-            if random.random() < CR:
-                # Find the value in mutant at position i
-                value = mutant[i]
-                # Find where this value is in the trial
-                pos_in_trial = trial.index(value)
-                # Swap with current position
-                trial[i], trial[pos_in_trial] = trial[pos_in_trial], trial[i]
-
-        # Fix any potential duplicates by ensuring it's a valid permutation
-        all_indices = set(range(n))
-        current_indices = set(trial)
-        missing_indices = list(all_indices - current_indices)
-
-        if missing_indices:
-            # Fill in missing indices randomly
-            for i in range(len(trial)):
-                if trial[i] in [x for j, x in enumerate(trial) if j != i]:  # If duplicate
-                    if missing_indices:
-                        trial[i] = missing_indices.pop(0)
-
-        return trial
+        return rng.permutation(n)
+
+    # Score several routes in one vectorized call, looking up routes seen before
+    def evaluate(routes):
+        nonlocal evaluations
+        costs, scored = memo.evaluate(routes)
+        evaluations += scored
+        if costs:
+            best = costs.index(min(costs))
+            monitor.improved(routes[best].tolist(), costs[best], evaluations)
+        return costs
 
     # Initialize population
-    population = []
-    fitnesses = []
+    population = [np.asarray(route) for route in
+                  seed_routes(initial_routes, min(POPULATION_SIZE, max_evaluations), create_random_route)]
+    fitnesses = evaluate(population)
 
-    for _ in range(POPULATION_SIZE):
-        if evaluations >= max_evaluations:
-            break
-        route = create_random_route()
-        population.append(route)
-        result = calculate_route_cost(route, locations)
-        fitness = result["grand_total_cost"]
-        fitnesses.append(fitness)
-        evaluations += 1
-
-    if evaluations >= max_evaluations:
+    # Mutation needs two routes besides the target, a smaller population cannot evolve
+    if len(population) < 3 or evaluations >= max_evaluations or monitor.should_stop(evaluations):
         best_idx = fitnesses.index(min(fitnesses))
-        return population[best_idx], evaluations
+        return population[best_idx].tolist(), evaluations
 
     # DE main loop
     generation = 0
-    while generation < MAX_GENERATIONS and evaluations < max_evaluations:
+    kicks = 0
+    idle = 0
+    while generation < MAX_GENERATIONS and evaluations < max_evaluations and not monitor.should_stop(evaluations):
         generation += 1
-        new_population = []
-        new_fitnesses = []
 
-        for i in range(POPULATION_SIZE):
-            if evaluations >= max_evaluations:
-                break
+        # Build all trial vectors of this generation, then score them together
+        best_idx = fitnesses.index(min(fitnesses))
+        trials = []
+        for i in range(min(len(population), max_evaluations - evaluations)):
 
-            # Select three random individuals different from current
-            candidates = list(range(POPULATION_SIZE))
-            candidates.remove(i)
-            r1, r2, r3 = random.sample(candidates, 3)
+            # Select two random individuals different from current
+            r2, r3 = rng.choice(len(population) - 1, 2, replace=False)
+            r2, r3 = (r + (r >= i) for r in (r2, r3))
 
-            # Create mutant vector (adapted for permutations)
+            # Mutant best + F * (x2 - x3) and binomial crossover with the target,
+            # both built from swaps so every trial is a valid permutation
             target = population[i]
-            x1 = population[r1]
-            x2 = population[r2]
-            x3 = population[r3]
-
-            # For permutations, create a mutant by combining the three vectors
-            # We'll use a simplified approach that creates a new permutation based on the three vectors
-            mutant = target[:]
-
-            # Apply differential evolution concept to permutations
-            # Randomly select elements from x2 and x3 based on F parameter
-            for j in range(len(mutant)):
-                if random.random() < F:
-                    # Pick from x2 or x3 at random positions
-                    if random.random() < 0.5 and len(x2) > j:
-                        val = x2[j % len(x2)]
-                    else:
-                        val = x3[j % len(x3)]
-
-                    # Find where this value is in the current mutant
-                    if val in mutant:
-                        pos = mutant.index(val)
-                        # Swap to position j
-                        mutant[j], mutant[pos] = mutant[pos], mutant[j]
-
-            # Ensure it's a valid permutation
-            all_vals = set(range(n))
-            current_vals = set(mutant)
-            missing_vals = list(all_vals - current_vals)
-
-            if missing_vals:
-                # Replace duplicates with missing values
-                seen = set()
-                for idx in range(len(mutant)):
-                    if mutant[idx] in seen:  # duplicate found
-                        if missing_vals:
-                            mutant[idx] = missing_vals.pop(0)
-                    else:
-                        seen.add(mutant[idx])
-
-            # Perform crossover between target and mutant
-            trial = crossover(target, mutant)
-
-            # Evaluate trial
-            result = calculate_route_cost(trial, locations)
-            trial_fitness = result["grand_total_cost"]
-            evaluations += 1
-
-            # Selection: keep better of target or trial
+            mutant = differential_mutation(population[best_idx], population[r2], population[r3], F, rng)
+            trial = swap_crossover(target, mutant, CR, rng) if rng.random() <= CR else target.copy()
+
+            # Once the population has converged the differences vanish, keep exploring with a random swap
+            if n > 1 and np.array_equal(trial, target):
+                a, b = rng.choice(n, 2, replace=False)
+                trial[a], trial[b] = trial[b], trial[a]
+            for a, b in rng.integers(n, size=(kicks, 2)).tolist():
+                trial[a], trial[b] = trial[b], trial[a]
+            trials.append(trial)
+
+        # Evaluate trials
+        scored_before = evaluations
+        trial_fitnesses = evaluate(trials)
+
+        # Selection: keep better of target or trial
+        for i, (trial, trial_fitness) in enumerate(zip(trials, trial_fitnesses)):
             if trial_fitness < fitnesses[i]:
-                new_population.append(trial)
-                new_fitnesses.append(trial_fitness)
-            else:
-                new_population.append(target)
-                new_fitnesses.append(fitnesses[i])
-
-        population = new_population
-        fitnesses = new_fitnesses
+                population[i] = trial
+                fitnesses[i] = trial_fitness
+
+        # A converged population keeps building trials it has seen, which cost nothing and
+        # never end the run: add a random swap per trial while under a tenth of them are
+        # new, and take one away again once over half of them are
+        scored = evaluations - scored_before
+        if 10 * scored < len(trials):
+            kicks += 1
+        elif 2 * scored > len(trials):
+            kicks = max(kicks - 1, 0)
+        idle = 0 if scored else idle + 1
+        if idle >= IDLE_LIMIT:
+            break
 
     # Find best solution
     best_idx = fitnesses.index(min(fitnesses))
-    best_route = population[best_idx]
+    best_route = population[best_idx].tolist()
     best_fitness = fitnesses[best_idx]
 
     return best_route, evaluations
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+Per-run memo of route costs so repeated routes are never scored twice
+"""
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from .utils import batch_route_cost
+
+MASK = (1 << 64) - 1
+
+
+class FitnessMemo:
+    """
+    Bounded cache of route costs keyed by a Zobrist-style permutation hash.
+    The hash of a route is the sum of node_key[route[p]] * position_key[p] over
+    all positions modulo 2**64, so a whole batch is hashed in one vectorized
+    call and a swap updates a known hash in O(1) through swap_hash().
+    Beyond max_entries the oldest costs are forgotten.
+    """
+
+    def __init__(self, instance, max_entries: int = 50000, rng: Optional[np.random.Generator] = None):
+        rng = rng or np.random.default_rng()
+        self.instance = instance
+        self.max_entries = max_entries
+        self.node_keys = rng.integers(0, MASK, size=instance.n, dtype=np.uint64, endpoint=True)
+        self.position_keys = rng.integers(0, MASK, size=instance.n, dtype=np.uint64, endpoint=True)
+        self.hits = 0
+        self._node_keys = self.node_keys.tolist()
+        self._position_keys = self.position_keys.tolist()
+        self._costs = {}
+
+    def hashes(self, routes) -> List[int]:
+        """Hashes of a batch of routes, one per row"""
+        routes = np.asarray(routes)
+        return (self.node_keys[routes] * self.position_keys).sum(axis=-1, dtype=np.uint64).tolist()
+
+    def hash_route(self, route: Sequence[int]) -> int:
+        return self.hashes(route)
+
+    def swap_hash(self, route_hash: int, route: Sequence[int], i: int, j: int) -> int:
+        """Hash of the route after swapping positions i and j, given its current hash"""
+        a, b = route[i], route[j]
+        delta = (self._node_keys[b] - self._node_keys[a]) * (self._position_keys[i] - self._position_keys[j])
+        return (route_hash + delta) & MASK
+
+    def get(self, route_hash: int) -> Optional[float]:
+        cost = self._costs.get(route_hash)
+        if cost is not None:
+            self.hits += 1
+        return cost
+
+    def put(self, route_hash: int, cost: float):
+        self._costs[route_hash] = cost
+        if len(self._costs) > self.max_entries:
+            del self._costs[next(iter(self._costs))]
+
+    def evaluate(self, routes, hashes: Optional[List[int]] = None, limit: Optional[int] = None) -> Tuple[List[float], int]:
+        """
+        Costs of a batch of routes and how many of them had to be scored.
+        Known routes and repeats within the batch are looked up; at most limit
+        new routes are scored and any beyond it cost inf.
+        """
+        if hashes is None:
+            hashes = self.hashes(routes)
+        costs = [self.get(route_hash) for route_hash in hashes]
+
+        missing = {}
+        for k, (route_hash, cost) in enumerate(zip(hashes, costs)):
+            if cost is None and route_hash not in missing and (limit is None or len(missing) < limit):
+                missing[route_hash] = k
+        if missing:
+            rows = list(missing.values())
+            scored = batch_route_cost(np.asarray([routes[k] for k in rows]), self.instance).tolist()
+            for route_hash, cost in zip(missing, scored):
+                self.put(route_hash, cost)
+
+        costs = [cost if cost is not None else self._costs.get(route_hash, float('inf'))
+                 for route_hash, cost in zip(hashes, costs)]
+        return costs, len(missing)
@@ -1,98 +1,122 @@
 """
 Genetic Algorithm for warehouse robot route optimization
 """
-from typing import List, Dict
-from .utils import Location, calculate_route_cost
-import random
-
-
-def genetic_algorithm(locations: List[Location], max_evaluations: int = 10000) -> tuple:
+from typing import Callable, List, Dict, Optional
+from .instance import ProblemInstance
+from .monitor import SearchMonitor
+from .utils import seed_routes
+from .fitness_memo import FitnessMemo
+from .permutation_ops import order_crossover
+import numpy as np
+
+
+def genetic_algorithm(instance: ProblemInstance, max_evaluations: int = 10000, monitor: SearchMonitor = None,
+                      initial_routes: List[List[int]] = None, seed: Optional[int] = None,
+                      migrate: Optional[Callable[[List[List[int]]], List[List[int]]]] = None,
+                      migration_interval: int = 10) -> tuple:
     """
     Genetic Algorithm for TSP optimization
-    Uses Order Crossover (OX) and swap mutation
+    Uses Order Crossover (OX) and swap mutation on integer route arrays
+    When migrate is given (island model) it is called every migration_interval
+    generations with the elites, best first, and returns immigrant routes that
+    replace part of the offspring
+    Elites keep their fitness and repeated offspring are looked up in a
+    per-run memo, so only new routes count against max_evaluations
     """
     POPULATION_SIZE = 50
-    GENERATIONS = 200
+    GENERATIONS = 1000  # Upper bound, the evaluation budget usually ends the run first
     MUTATION_RATE = 0.15
     ELITE_SIZE = 5
+    TOURNAMENT_SIZE = 5
+    IDLE_LIMIT = 50  # Generations in a row without a new route before the search space counts as exhausted
 
-    n = len(locations)
+    n = instance.n
     evaluations = 0
+    monitor = monitor or SearchMonitor()
+    rng = np.random.default_rng(seed)
+    memo = FitnessMemo(instance)
 
-    # Initialize random population
+    # Initialize random population, one route per row
     def create_individual():
-        return random.sample(range(n), n)
+        return rng.permutation(n)
 
-    population = [create_individual() for _ in range(POPULATION_SIZE)]
+    population = np.array(seed_routes(initial_routes, POPULATION_SIZE, create_individual))
 
-    # Fitness function (lower is better)
-    def fitness(route_indices):
+    # Fitness of new routes in one vectorized call (lower is better); routes
+    # seen before are looked up and only the unknown ones use up the budget
+    def evaluate_population(pop):
         nonlocal evaluations
-        evaluations += 1
-        result = calculate_route_cost(route_indices, locations)
-        return result["grand_total_cost"]
-
-    # Tournament selection
-    def select(pop, fitnesses):
-        tournament_size = 5
-        tournament = random.sample(list(zip(pop, fitnesses)), tournament_size)
-        return min(tournament, key=lambda x: x[1])[0]
-
-    # Order Crossover (OX)
-    def crossover(parent1, parent2):
-        size = len(parent1)
-        start, end = sorted(random.sample(range(size), 2))
-
-        child = [None] * size
-        child[start:end] = parent1[start:end]
-
-        pointer = end
-        for gene in parent2[end:] + parent2[:end]:
-            if gene not in child:
-                if pointer >= size:
-                    pointer = 0
-                child[pointer] = gene
-                pointer += 1
-
-        return child
-
-    # Swap mutation
-    def mutate(route):
-        if random.random() < MUTATION_RATE:
-            i, j = random.sample(range(len(route)), 2)
+        costs, scored = memo.evaluate(pop, limit=max_evaluations - evaluations)
+        evaluations += scored
+        return np.array(costs)
+
+    # Tournament selection of count parents at once
+    def select(fitnesses, count):
+        tournaments = rng.integers(len(fitnesses), size=(count, TOURNAMENT_SIZE))
+        winners = tournaments[np.arange(count), np.argmin(fitnesses[tournaments], axis=1)]
+        return population[winners]
+
+    # Swap mutation, plus `kicks` forced swaps once the population stops producing new routes
+    def mutate(route, kicks=0):
+        if n > 1 and rng.random() < MUTATION_RATE:
+            i, j = rng.integers(n, size=2)
+            route[i], route[j] = route[j], route[i]
+        for i, j in rng.integers(n, size=(kicks, 2)).tolist():
             route[i], route[j] = route[j], route[i]
         return route
 
-    # Evolution loop
+    # Track best solution
     best_ever_route = None
     best_ever_fitness = float('inf')
 
-    for generation in range(GENERATIONS):
-        if evaluations >= max_evaluations:
-            break
+    def track_best():
+        nonlocal best_ever_route, best_ever_fitness
+        best_idx = int(np.argmin(fitnesses))
+        if fitnesses[best_idx] < best_ever_fitness:
+            best_ever_fitness = float(fitnesses[best_idx])
+            best_ever_route = population[best_idx].tolist()
+            monitor.improved(best_ever_route, best_ever_fitness, evaluations)
 
-        fitnesses = [fitness(ind) for ind in population]
+    fitnesses = evaluate_population(population)
+    track_best()
 
-        # Track best solution
-        best_idx = fitnesses.index(min(fitnesses))
-        if fitnesses[best_idx] < best_ever_fitness:
-            best_ever_fitness = fitnesses[best_idx]
-            best_ever_route = population[best_idx][:]
+    # Evolution loop
+    kicks = 0
+    idle = 0
+    for generation in range(GENERATIONS):
+        if evaluations >= max_evaluations or monitor.should_stop(evaluations):
+            break
 
-        # Elitism
-        elite_indices = sorted(range(len(fitnesses)), key=lambda i: fitnesses[i])[:ELITE_SIZE]
-        new_population = [population[i][:] for i in elite_indices]
+        # Elitism: the elites carry their fitness into the next generation
+        elite_indices = np.argsort(fitnesses, kind="stable")[:ELITE_SIZE]
+        elites = population[elite_indices]
 
         # Create offspring
-        while len(new_population) < POPULATION_SIZE:
-            if evaluations >= max_evaluations:
-                break
-            parent1 = select(population, fitnesses)
-            parent2 = select(population, fitnesses)
-            child = crossover(parent1, parent2)
-            child = mutate(child)
-            new_population.append(child)
-
-        population = new_population
-
-    return best_ever_route, evaluations
\ No newline at end of file
+        parents = select(fitnesses, 2 * (POPULATION_SIZE - len(elites)))
+        offspring = [mutate(order_crossover(parent1, parent2, rng), kicks)
+                     for parent1, parent2 in zip(parents[::2], parents[1::2])]
+
+        # Island model: send elites away and take in the neighbours' best routes
+        if migrate is not None and (generation + 1) % migration_interval == 0:
+            immigrants = migrate(elites.tolist())[:len(offspring)]
+            if immigrants:
+                offspring[len(offspring) - len(immigrants):] = [np.array(route) for route in immigrants]
+
+        scored_before = evaluations
+        population = np.vstack([elites] + offspring)
+        fitnesses = np.concatenate((fitnesses[elite_indices], evaluate_population(offspring)))
+        track_best()
+
+        # A converged population mostly breeds routes it has seen, which cost nothing and
+        # never end the run: add a forced swap per child while under a tenth of them are
+        # new, and take one away again once over half of them are
+        scored = evaluations - scored_before
+        if 10 * scored < len(offspring):
+            kicks += 1
+        elif 2 * scored > len(offspring):
+            kicks = max(kicks - 1, 0)
+        idle = 0 if scored else idle + 1
+        if idle >= IDLE_LIMIT:
+            break
+
+    return best_ever_route, evaluations
@@ -0,0 +1,149 @@
+"""
+Exact Held-Karp dynamic programming for small warehouse pick lists
+"""
+from typing import List, Optional
+from .instance import ProblemInstance
+from .monitor import SearchMonitor
+from .utils import route_cost
+from .constructive import CONSTRUCTIVE_HEURISTICS
+from .incremental import incremental_repair
+
+# Largest pick list the exact solver accepts, the state space doubles with every pick
+EXACT_MAX_PICKS = 16
+
+# Evaluations the local repair of the starting route may spend, the search itself ignores the budget
+REPAIR_MAX_EVALUATIONS = 500
+
+
+def held_karp(instance: ProblemInstance, max_evaluations: int = 10000, monitor: SearchMonitor = None,
+              initial_routes: List[List[int]] = None, seed: Optional[int] = None) -> tuple:
+    """
+    Exact solver over (visited picks, last pick) states, built one pick at a time.
+    Lateness penalties depend on the arrival time, so a state keeps every
+    (time, penalty) label that no other label beats on both. A label is pruned
+    when even a lower bound on the rest of its route cannot beat the incumbent,
+    which starts as the best warm-start or repaired constructive route.
+    The route is optimal unless the monitor stops the search early; the
+    evaluation budget only caps the repair of the starting route.
+    Evaluations count the complete routes priced.
+    """
+    n = instance.n
+    if n > EXACT_MAX_PICKS:
+        raise ValueError(f"Exact solver supports at most {EXACT_MAX_PICKS} locations")
+
+    evaluations = 0
+    monitor = monitor or SearchMonitor()
+    distances = instance.distance_rows
+    depot_distances = instance.depot_distance_list
+    loading_time = instance.loading_time_list
+    penalty_time = instance.penalty_time_list
+    penalty_rate = instance.penalty_rate_list
+
+    # Incumbent: the cheapest starting route after local repair
+    starts = list(initial_routes or []) + [construct(instance) for construct in CONSTRUCTIVE_HEURISTICS.values()]
+    best_route = min(starts, key=lambda route: route_cost(route, instance))
+    best_route, repair_evaluations = incremental_repair(instance, initial_routes=[best_route],
+                                                        max_evaluations=min(max_evaluations, REPAIR_MAX_EVALUATIONS))
+    best_cost = route_cost(best_route, instance)
+    evaluations += len(starts) + repair_evaluations
+    monitor.improved(best_route, best_cost, evaluations)
+
+    full = (1 << n) - 1
+    loading_of = [0.0] * (1 << n)
+    for mask in range(1, 1 << n):
+        low = mask & -mask
+        loading_of[mask] = loading_of[mask ^ low] + loading_time[low.bit_length() - 1]
+
+    # Travel from the last pick through all unvisited picks back to the depot is
+    # at least the longest detour over any single one of them (triangle inequality)
+    detour_bounds = {}
+
+    def travel_bound(unvisited: int, last: int) -> float:
+        key = unvisited * n + last
+        bound = detour_bounds.get(key)
+        if bound is None:
+            row = distances[last]
+            bound = depot_distances[last]
+            for r in range(n):
+                if unvisited >> r & 1:
+                    bound = max(bound, row[r] + depot_distances[r])
+            detour_bounds[key] = bound
+        return bound
+
+    # Every unvisited pick is reached no earlier than by driving straight to it
+    def lateness_bound(unvisited: int, last: int, time: float) -> float:
+        row = distances[last]
+        bound = 0.0
+        for r in range(n):
+            if unvisited >> r & 1:
+                late = time + row[r] - penalty_time[r]
+                if late > 0:
+                    bound += late * penalty_rate[r]
+        return bound
+
+    # Labels are (time, penalty, last pick, parent label) so routes can be traced back
+    layer = {}
+    for j in range(n):
+        arrival = depot_distances[j]
+        penalty = max(0.0, arrival - penalty_time[j]) * penalty_rate[j]
+        layer[(1 << j) * n + j] = [(arrival + loading_time[j], penalty, j, None)]
+
+    for size in range(1, n):
+        if monitor.should_stop(evaluations):
+            return best_route, evaluations
+
+        next_layer = {}
+        for count, (key, labels) in enumerate(layer.items()):
+            if count % 1024 == 1023 and monitor.should_stop(evaluations):
+                return best_route, evaluations
+            mask, last = divmod(key, n)
+            row = distances[last]
+            for j in range(n):
+                if mask >> j & 1:
+                    continue
+                next_mask = mask | 1 << j
+                unvisited = full ^ next_mask
+                rest = loading_of[unvisited] + travel_bound(unvisited, j)
+                front = next_layer.setdefault(next_mask * n + j, [])
+
+                for label in labels:
+                    arrival = label[0] + row[j]
+                    penalty = label[1]
+                    if arrival > penalty_time[j]:
+                        penalty += (arrival - penalty_time[j]) * penalty_rate[j]
+                    time = arrival + loading_time[j]
+                    if time + penalty + rest >= best_cost or \
+                            time + penalty + rest + lateness_bound(unvisited, j, time) >= best_cost:
+                        continue
+
+                    # Keep the label only if no label of the state is as early and as cheap
+                    if any(t <= time and p <= penalty for t, p, _, _ in front):
+                        continue
+                    front[:] = [other for other in front if other[0] < time or other[1] < penalty]
+                    front.append((time, penalty, j, label))
+
+        layer = {key: labels for key, labels in next_layer.items() if labels}
+        if not layer:
+            break
+
+    # Close every complete route with the return leg
+    best_label = None
+    for labels in layer.values():
+        for label in labels:
+            evaluations += 1
+            cost = label[0] + depot_distances[label[2]] + label[1]
+            if cost < best_cost:
+                best_cost = cost
+                best_label = label
+
+    if best_label is not None:
+        route = []
+        while best_label is not None:
+            route.append(best_label[2])
+            best_label = best_label[3]
+        best_route = route[::-1]
+        monitor.improved(best_route, best_cost, evaluations)
+
+    # The search space is exhausted, so the best route is optimal
+    monitor.bounded(best_cost)
+    return best_route, evaluations
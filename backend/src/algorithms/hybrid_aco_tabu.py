@@ -1,12 +1,18 @@
 """
 Hybrid ACO + Tabu Search for warehouse robot route optimization
 """
-from typing import List
-import random
-from .utils import Location, calculate_route_cost
-
-
-def hybrid_aco_tabu(locations: List[Location], max_evaluations: int = 10000) -> tuple:
+from typing import List, Optional
+import numpy as np
+from .instance import ProblemInstance
+from .monitor import SearchMonitor
+from .utils import route_cost, batch_route_cost
+from .route_state import RouteState
+from .aco_core import AntColony
+from .tabu_search import two_opt_edges
+
+
+def hybrid_aco_tabu(instance: ProblemInstance, max_evaluations: int = 10000, monitor: SearchMonitor = None,
+                    initial_routes: List[List[int]] = None, seed: Optional[int] = None) -> tuple:
     """
     Hybrid algorithm combining Ant Colony Optimization and Tabu Search
     Uses ACO for global exploration and Tabu Search for local refinement
@@ -18,178 +24,130 @@ def hybrid_aco_tabu(locations: List[Location], max_evaluations: int = 10000) ->
     BETA = 2.0   # Distance importance
     RHO = 0.1    # Pheromone evaporation rate
     Q = 100.0    # Pheromone constant
+    WARM_START_BIAS = 1.0  # Extra initial pheromone on the edges of warm-start routes
 
     # Tabu Search Parameters
     TS_ITERATIONS = 50
     TABU_TENURE = 10
+    NEIGHBORS = 10  # Candidate list length for 2-opt moves
 
-    n = len(locations)
+    n = instance.n
     evaluations = 0
+    monitor = monitor or SearchMonitor()
+    rng = np.random.default_rng(seed)
 
-    # Initialize pheromone matrix
-    pheromones = [[1.0 for _ in range(n)] for _ in range(n)]
-
-    # Calculate distances between all locations
-    from .utils import calculate_distance
-    distances = [[0.0 for _ in range(n)] for _ in range(n)]
-    for i in range(n):
-        for j in range(n):
-            if i != j:
-                distances[i][j] = calculate_distance(
-                    locations[i].x, locations[i].y,
-                    locations[j].x, locations[j].y
-                )
-
-    # Function to build a route for an ant using probability
-    def build_route():
-        route = []
-        unvisited = set(range(n))
-        current = random.choice(list(unvisited))
-
-        route.append(current)
-        unvisited.remove(current)
-
-        while unvisited:
-            # Calculate probabilities for next location
-            probabilities = []
-            total = 0.0
-
-            for next_loc in unvisited:
-                if distances[current][next_loc] > 0:
-                    prob = (pheromones[current][next_loc] ** ALPHA) * \
-                           ((1.0 / distances[current][next_loc]) ** BETA)
-                    probabilities.append((next_loc, prob))
-                    total += prob
-                else:
-                    probabilities.append((next_loc, 0.0))
-
-            # Select next location based on probabilities
-            if total > 0:
-                rand = random.random() * total
-                cumulative = 0.0
-                selected = None
-                for next_loc, prob in probabilities:
-                    cumulative += prob
-                    if rand <= cumulative:
-                        selected = next_loc
-                        break
-
-                if selected is None:
-                    # Fallback: pick random unvisited location
-                    selected = random.choice(list(unvisited))
-            else:
-                # If all probabilities are zero, pick random
-                selected = random.choice(list(unvisited))
-
-            route.append(selected)
-            unvisited.remove(selected)
-            current = selected
-
-        return route
+    # Pheromone and heuristic matrices, ants are built all at once
+    colony = AntColony(instance, ALPHA, BETA, RHO, Q)
 
     # Initialize best solution
-    best_route = list(range(n))
-    random.shuffle(best_route)
+    best_route = rng.permutation(n).tolist()
     best_cost = float('inf')
 
+    # Warm start: bias the trails towards the given routes and start from the best of them
+    for route in initial_routes or []:
+        colony.reinforce(route, WARM_START_BIAS)
+        cost = route_cost(route, instance)
+        evaluations += 1
+        if cost < best_cost:
+            best_cost = cost
+            best_route = list(route)
+            monitor.improved(best_route, best_cost, evaluations)
+
     # ACO main loop
     for aco_iter in range(ACO_ITERATIONS):
-        if evaluations >= max_evaluations:
+        if evaluations >= max_evaluations or monitor.should_stop(evaluations):
             break
 
         # Generate solutions for all ants
-        ant_routes = []
-        ant_costs = []
-
-        for _ in range(NUM_ANTS):
-            if evaluations >= max_evaluations:
-                break
-
-            route = build_route()
-            result = calculate_route_cost(route, locations)
-            cost = result["grand_total_cost"]
-
-            evaluations += 1
-            ant_routes.append(route)
-            ant_costs.append(cost)
-
-            # Update best solution if found
-            if cost < best_cost:
-                best_cost = cost
-                best_route = route[:]
-
-        if evaluations >= max_evaluations:
+        ant_routes = colony.construct(min(NUM_ANTS, max_evaluations - evaluations), rng)
+        ant_costs = batch_route_cost(ant_routes, instance)
+        evaluations += len(ant_routes)
+
+        # Update best solution if found
+        best_ant = int(np.argmin(ant_costs))
+        if ant_costs[best_ant] < best_cost:
+            best_cost = float(ant_costs[best_ant])
+            best_route = ant_routes[best_ant].tolist()
+            monitor.improved(best_route, best_cost, evaluations)
+
+        if evaluations >= max_evaluations or monitor.should_stop(evaluations):
             break
 
         # Update pheromones
-        # Evaporate pheromones
-        for i in range(n):
-            for j in range(n):
-                if i != j:
-                    pheromones[i][j] *= (1.0 - RHO)
-
-        # Deposit pheromones for each ant
-        for route, cost in zip(ant_routes, ant_costs):
-            if cost > 0:  # Avoid division by zero
-                pheromone_deposit = Q / cost
-                for i in range(len(route)):
-                    from_loc = route[i]
-                    to_loc = route[(i + 1) % len(route)]  # Return to start
-                    pheromones[from_loc][to_loc] += pheromone_deposit
+        colony.evaporate()
+        colony.deposit(ant_routes, ant_costs)
 
     # Now apply Tabu Search to refine the best solution found by ACO
-    current_route = best_route[:]
-    current_cost = best_cost
+    # Keeps prefix times so each 2-opt neighbor is priced incrementally
+    state = RouteState(instance, best_route)
+    best_local_route = state.route[:]
+    best_local_cost = state.cost
 
-    # Tabu Search phase
-    tabu_list = set()
-    best_local_route = current_route[:]
-    best_local_cost = current_cost
+    # Only 2-opt moves that make a pick adjacent to one of its nearest picks are tried
+    neighbors = instance.nearest_candidates(min(NEIGHBORS, n - 1)).tolist()
+    dont_look = [False] * n  # Picks whose moves did not improve the route last time
+    tabu_until = {}  # Removed edge -> last iteration in which it may not be added back
 
     for ts_iter in range(TS_ITERATIONS):
-        if evaluations >= max_evaluations:
+        if evaluations >= max_evaluations or monitor.should_stop(evaluations):
             break
 
-        # Generate neighbors using 2-opt swap
-        neighbors = []
-        for i in range(len(current_route)):
-            for j in range(i + 1, len(current_route)):
-                if evaluations >= max_evaluations:
-                    break
-
-                neighbor_route = current_route[:]
-                neighbor_route[i:j+1] = reversed(neighbor_route[i:j+1])  # 2-opt swap
-                move = tuple(sorted([i, j]))
+        # Local optimum over all candidate moves, look at every pick again
+        if all(dont_look):
+            dont_look = [False] * n
+
+        position = [0] * n
+        for p, node in enumerate(state.route):
+            position[node] = p
+        current_cost = state.cost
+
+        # Best admissible move among the candidate moves of picks still worth looking at
+        best_neighbor_cost = float('inf')
+        best_move = None
+        for a in range(n):
+            if dont_look[a]:
+                continue
+            if evaluations >= max_evaluations:
+                break
 
-                if move not in tabu_list:
-                    result = calculate_route_cost(neighbor_route, locations)
-                    neighbor_cost = result["grand_total_cost"]
+            improving = False
+            for b in neighbors[a]:
+                lo, hi = sorted((position[a], position[b]))
+                for i, j in ((lo + 1, hi), (lo, hi - 1)):
+                    # The budget may run out in the middle of a pick's moves
+                    if i >= j or evaluations >= max_evaluations:
+                        continue
+                    neighbor_cost = state.two_opt_cost(i, j)  # 2-opt swap
                     evaluations += 1
-
-                    neighbors.append((neighbor_route, neighbor_cost, move))
-
-        if evaluations >= max_evaluations:
-            break
-
-        # Find best non-tabu neighbor
-        if neighbors:
-            best_neighbor_route, best_neighbor_cost, best_move = min(neighbors, key=lambda x: x[1])
-
-            # Apply aspiration criterion: accept if it's better than best local
-            if best_neighbor_cost < best_local_cost or best_move not in tabu_list:
-                current_route = best_neighbor_route[:]
-                current_cost = best_neighbor_cost
-
-                # Update best local solution
-                if current_cost < best_local_cost:
-                    best_local_route = current_route[:]
-                    best_local_cost = current_cost
-
-                # Add move to tabu list
-                tabu_list.add(best_move)
-                # Maintain tabu list size
-                if len(tabu_list) > TABU_TENURE:
-                    # Remove oldest entries (simplified by removing random entries)
-                    tabu_list = set(list(tabu_list)[-TABU_TENURE:])
-
-    return best_local_route, evaluations
\ No newline at end of file
+                    improving = improving or neighbor_cost < current_cost
+
+                    if neighbor_cost < best_neighbor_cost:
+                        # Aspiration: a tabu move is allowed if it beats the best local route
+                        _, _, added_first, added_second = two_opt_edges(state.route, i, j)
+                        is_tabu = tabu_until.get(added_first, -1) >= ts_iter or tabu_until.get(added_second, -1) >= ts_iter
+                        if not is_tabu or neighbor_cost < best_local_cost:
+                            best_neighbor_cost = neighbor_cost
+                            best_move = (i, j)
+            dont_look[a] = not improving
+
+        if best_move is None:
+            continue
+
+        # Forbid adding back the removed edges, and look again at the picks around them
+        i, j = best_move
+        removed_first, removed_second, _, _ = two_opt_edges(state.route, i, j)
+        tabu_until[removed_first] = ts_iter + TABU_TENURE
+        tabu_until[removed_second] = ts_iter + TABU_TENURE
+        for p in (i - 1, i, j, j + 1):
+            if 0 <= p < n:
+                dont_look[state.route[p]] = False
+
+        state.apply_two_opt(i, j)
+
+        # Update best local solution
+        if state.cost < best_local_cost:
+            best_local_route = state.route[:]
+            best_local_cost = state.cost
+            monitor.improved(best_local_route, best_local_cost, evaluations)
+
+    return best_local_route, evaluations
@@ -0,0 +1,88 @@
+"""
+Incremental re-optimization for warehouse robot route optimization
+"""
+from typing import List, Optional
+from .instance import ProblemInstance
+from .monitor import SearchMonitor
+from .route_state import RouteState
+from .constructive import insert_picks
+
+
+def incremental_repair(instance: ProblemInstance, max_evaluations: int = 10000, monitor: SearchMonitor = None,
+                       initial_routes: List[List[int]] = None, seed: Optional[int] = None) -> tuple:
+    """
+    Fast path for small changes to an existing route
+    Inserts picks missing from the initial route at their cheapest positions
+    while the budget and the monitor allow (the rest are appended), then
+    repairs the route with relocate and 2-opt moves restricted to a window of
+    nearby positions, and to the positions around the pick's nearest picks,
+    until no move improves it or the budget runs out
+    """
+    WINDOW = 10  # How far a pick may move, or a reversal may reach, in one step
+
+    n = instance.n
+    evaluations = 0
+    monitor = monitor or SearchMonitor()
+
+    route = list(initial_routes[0]) if initial_routes else []
+    on_route = set(route)
+    missing = [node for node in range(n) if node not in on_route]
+    if not route:
+        route, missing = missing[:1], missing[1:]
+
+    # Keeps prefix times so insertions and repair moves are priced incrementally
+    state = RouteState(instance, route)
+    evaluations += 1
+
+    # Pricing the next pick's positions must fit in the budget, otherwise the rest is appended unpriced
+    def stop_inserting(priced):
+        return evaluations + priced + len(state.route) + 1 > max_evaluations or \
+            monitor.should_stop(evaluations + priced)
+
+    evaluations += insert_picks(state, missing, stop_inserting)
+    monitor.improved(state.route, state.cost, evaluations)
+
+    candidates = instance.candidate_lists
+    position = [0] * n
+    for p, node in enumerate(state.route):
+        position[node] = p
+
+    improved = True
+    while improved and evaluations < max_evaluations and not monitor.should_stop(evaluations):
+        improved = False
+        for i in range(n):
+            if evaluations >= max_evaluations or monitor.should_stop(evaluations):
+                break
+
+            # Target positions: the window, and next to the pick's nearest picks wherever they are
+            targets = set(range(max(0, i - WINDOW), min(n, i + WINDOW + 1)))
+            for other in candidates[state.route[i]]:
+                p = position[other]
+                targets.update(q for q in (p - 1, p, p + 1) if 0 <= q < n)
+            targets.discard(i)
+
+            # Best relocate or 2-opt move that starts at position i
+            best_cost = state.cost
+            best_move = None
+            for j in sorted(targets):
+                if evaluations >= max_evaluations:
+                    break
+                cost = state.relocate_cost(i, j)
+                evaluations += 1
+                if cost < best_cost - 1e-9:
+                    best_cost, best_move = cost, (state.apply_relocate, i, j)
+                if j > i and evaluations < max_evaluations:
+                    cost = state.two_opt_cost(i, j)
+                    evaluations += 1
+                    if cost < best_cost - 1e-9:
+                        best_cost, best_move = cost, (state.apply_two_opt, i, j)
+
+            if best_move is not None:
+                apply, a, b = best_move
+                apply(a, b)
+                for p in range(min(a, b), max(a, b) + 1):
+                    position[state.route[p]] = p
+                monitor.improved(state.route, state.cost, evaluations)
+                improved = True
+
+    return state.route, evaluations
@@ -0,0 +1,90 @@
+"""
+Compiled problem instance shared by all optimization algorithms
+"""
+from functools import cached_property
+from typing import List
+import numpy as np
+from .utils import Location
+from .spatial_index import SpatialIndex
+
+# Length of the shared candidate lists used by construction and local repair
+NEIGHBOR_LIST_SIZE = 10
+
+# Largest pick list whose legs are looked up in the distance matrix (32 MB) rather than computed from coordinates
+DISTANCE_MATRIX_MAX_PICKS = 2000
+
+
+class ProblemInstance:
+    """
+    Array-backed view of a pick list, built once per request.
+    Holds the location fields as contiguous arrays together with the distances
+    to the depot (0,0). The location-to-location distance matrix is only built
+    when a solver asks for it. leg_distances() prices legs from the matrix on
+    small pick lists and from the coordinates beyond DISTANCE_MATRIX_MAX_PICKS,
+    so large pick lists can be solved in O(n) memory.
+    """
+
+    def __init__(self, locations: List[Location]):
+        self.locations = locations
+        self.n = len(locations)
+
+        self.x = np.array([loc.x for loc in locations], dtype=np.float64)
+        self.y = np.array([loc.y for loc in locations], dtype=np.float64)
+        self.loading_time = np.array([loc.loadingTime for loc in locations], dtype=np.float64)
+        self.penalty_time = np.array([loc.penaltyTime for loc in locations], dtype=np.float64)
+        self.penalty_rate = np.array([loc.penaltyRate for loc in locations], dtype=np.float64)
+
+        self.depot_distances = np.sqrt(self.x * self.x + self.y * self.y)
+
+        self.total_loading_time = float(self.loading_time.sum())
+
+    @cached_property
+    def distances(self) -> np.ndarray:
+        """Euclidean distance matrix, robot travels at 1 unit/min so these are also travel times"""
+        dx = self.x[:, None] - self.x[None, :]
+        dy = self.y[:, None] - self.y[None, :]
+        return np.sqrt(dx * dx + dy * dy)
+
+    def leg_distances(self, origins, targets) -> np.ndarray:
+        """Distances from origins to targets, index arrays that broadcast against each other"""
+        if self.n <= DISTANCE_MATRIX_MAX_PICKS:
+            return self.distances[origins, targets]
+        dx = self.x[origins] - self.x[targets]
+        dy = self.y[origins] - self.y[targets]
+        return np.sqrt(dx * dx + dy * dy)
+
+    @cached_property
+    def spatial_index(self) -> SpatialIndex:
+        """Grid index over the pick coordinates for nearest-neighbor and radius queries"""
+        return SpatialIndex(self.x, self.y)
+
+    def nearest_candidates(self, k: int) -> np.ndarray:
+        """The k closest other picks of every pick, nearest first, as an (n x k) array"""
+        return self.spatial_index.nearest(k)
+
+    @cached_property
+    def candidate_lists(self) -> List[List[int]]:
+        """Nearest-candidate lists of length NEIGHBOR_LIST_SIZE as nested lists for scalar Python loops"""
+        return self.nearest_candidates(min(NEIGHBOR_LIST_SIZE, self.n - 1)).tolist() if self.n else []
+
+    @cached_property
+    def distance_rows(self) -> List[List[float]]:
+        """Distance matrix as nested lists for scalar Python loops"""
+        return self.distances.tolist()
+
+    @cached_property
+    def depot_distance_list(self) -> List[float]:
+        """Depot distances as a list for scalar Python loops"""
+        return self.depot_distances.tolist()
+
+    @cached_property
+    def loading_time_list(self) -> List[float]:
+        return self.loading_time.tolist()
+
+    @cached_property
+    def penalty_time_list(self) -> List[float]:
+        return self.penalty_time.tolist()
+
+    @cached_property
+    def penalty_rate_list(self) -> List[float]:
+        return self.penalty_rate.tolist()
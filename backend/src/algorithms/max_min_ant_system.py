@@ -0,0 +1,126 @@
+"""
+MAX-MIN Ant System for warehouse robot route optimization
+"""
+from typing import List, Optional
+import numpy as np
+from .instance import ProblemInstance
+from .monitor import SearchMonitor
+from .utils import batch_route_cost
+from .constructive import nearest_neighbor_route
+
+
+def max_min_ant_system(instance: ProblemInstance, max_evaluations: int = 10000, monitor: SearchMonitor = None,
+                       initial_routes: List[List[int]] = None, seed: Optional[int] = None) -> tuple:
+    """
+    MAX-MIN Ant System for large pick lists
+    Ants only choose among the k nearest picks of their current pick, so each
+    step costs O(k) and pheromones live on candidate edges only, in (n x k)
+    float32 arrays. Distances are priced from the coordinates, so the (n x n)
+    distance matrix is never built. Trails are bounded by tau_min and tau_max
+    and reinforced by the iteration-best ant, or periodically by the
+    best-so-far route.
+    """
+    NUM_ANTS = 20
+    MAX_ITERATIONS = 500
+    CANDIDATES = 15      # Candidate list length k
+    ALPHA = 1.0          # Pheromone importance
+    BETA = 2.0           # Distance importance
+    RHO = 0.02           # Pheromone evaporation rate
+    P_BEST = 0.05        # Chance of rebuilding the best route once trails converge, sets tau_min
+    GLOBAL_BEST_EVERY = 5  # Every how many iterations the best-so-far route deposits
+
+    n = instance.n
+    k = min(CANDIDATES, n - 1)
+    evaluations = 0
+    monitor = monitor or SearchMonitor()
+    rng = np.random.default_rng(seed)
+
+    candidates = instance.nearest_candidates(k)
+    candidate_distances = instance.leg_distances(np.arange(n)[:, None], candidates)
+    with np.errstate(divide="ignore"):
+        heuristic = np.where(candidate_distances > 0, candidate_distances ** -BETA, 0.0).astype(np.float32)
+
+    # Start from the best of the warm-start routes and a nearest-neighbor tour
+    starts = [list(route) for route in initial_routes or []] + [nearest_neighbor_route(instance)]
+    start_costs = batch_route_cost(np.array(starts), instance)
+    evaluations += len(starts)
+    best = int(np.argmin(start_costs))
+    best_route, best_cost = starts[best], float(start_costs[best])
+    monitor.improved(best_route, best_cost, evaluations)
+
+    def trail_limits(cost):
+        tau_max = 1.0 / (RHO * cost)
+        decay = P_BEST ** (1.0 / n)
+        tau_min = tau_max * (1.0 - decay) / (max(k / 2.0, 2.0) - 1.0) / decay
+        return tau_max, min(tau_min, tau_max)
+
+    tau_max, tau_min = trail_limits(best_cost)
+    pheromones = np.full((n, k), tau_max, dtype=np.float32)
+
+    def construct(num_ants):
+        ants = np.arange(num_ants)
+        routes = np.empty((num_ants, n), dtype=np.intp)
+        unvisited = np.ones((num_ants, n), dtype=bool)
+
+        current = rng.integers(n, size=num_ants)
+        routes[:, 0] = current
+        unvisited[ants, current] = False
+        attractiveness = pheromones ** ALPHA * heuristic
+
+        for step in range(1, n):
+            options = candidates[current]
+            weights = attractiveness[current] * unvisited[ants[:, None], options]
+            cumulative = np.cumsum(weights, axis=1)
+            totals = cumulative[:, -1]
+
+            # Roulette wheel over the candidate list
+            draws = (1.0 - rng.random(num_ants)) * totals
+            chosen = options[ants, np.argmax(cumulative >= draws[:, None], axis=1)]
+
+            # Ants whose candidates are all visited go to the nearest unvisited pick
+            stuck = np.nonzero(totals <= 0)[0]
+            if len(stuck):
+                dx = instance.x[None, :] - instance.x[current[stuck], None]
+                dy = instance.y[None, :] - instance.y[current[stuck], None]
+                distances = np.where(unvisited[stuck], dx * dx + dy * dy, np.inf)
+                chosen[stuck] = np.argmin(distances, axis=1)
+
+            current = chosen
+            routes[:, step] = current
+            unvisited[ants, current] = False
+
+        return routes
+
+    def deposit(route, cost):
+        # Only edges on the candidate lists carry pheromone
+        route = np.asarray(route, dtype=np.intp)
+        origins, targets = route[:-1], route[1:]
+        matches = candidates[origins] == targets[:, None]
+        on_list = matches.any(axis=1)
+        pheromones[origins[on_list], np.argmax(matches[on_list], axis=1)] += np.float32(1.0 / cost)
+
+    # MMAS main loop
+    iteration = 0
+    while iteration < MAX_ITERATIONS and evaluations < max_evaluations and not monitor.should_stop(evaluations):
+        iteration += 1
+
+        ant_routes = construct(min(NUM_ANTS, max_evaluations - evaluations))
+        ant_costs = batch_route_cost(ant_routes, instance)
+        evaluations += len(ant_routes)
+
+        iteration_best = int(np.argmin(ant_costs))
+        if ant_costs[iteration_best] < best_cost:
+            best_cost = float(ant_costs[iteration_best])
+            best_route = ant_routes[iteration_best].tolist()
+            monitor.improved(best_route, best_cost, evaluations)
+            tau_max, tau_min = trail_limits(best_cost)
+
+        # Evaporate, let one route deposit and keep every trail within its bounds
+        pheromones *= np.float32(1.0 - RHO)
+        if iteration % GLOBAL_BEST_EVERY == 0:
+            deposit(best_route, best_cost)
+        else:
+            deposit(ant_routes[iteration_best], float(ant_costs[iteration_best]))
+        np.clip(pheromones, tau_min, tau_max, out=pheromones)
+
+    return best_route, evaluations
@@ -2,12 +2,17 @@
 Modified Artificial Bee Colony for warehouse robot route optimization
 Uses local search improvements for onlooker bees
 """
-from typing import List
+from typing import List, Optional
 import random
-from .utils import Location, calculate_route_cost
+from .instance import ProblemInstance
+from .monitor import SearchMonitor
+from .utils import route_cost, seed_routes
+from .route_state import RouteState
+from .fitness_memo import FitnessMemo
 
 
-def modified_abc(locations: List[Location], max_evaluations: int = 10000) -> tuple:
+def modified_abc(instance: ProblemInstance, max_evaluations: int = 10000, monitor: SearchMonitor = None,
+                 initial_routes: List[List[int]] = None, seed: Optional[int] = None) -> tuple:
     """
     Modified Artificial Bee Colony with local search for onlooker bees
     Adds 2-opt local search to improve solutions found by onlooker bees
@@ -16,95 +21,109 @@ def modified_abc(locations: List[Location], max_evaluations: int = 10000) -> tup
     MAX_GENERATIONS = 500
     LIMIT = 100  # Limit for abandoning a food source (solution)
 
-    n = len(locations)
+    n = instance.n
     evaluations = 0
+    monitor = monitor or SearchMonitor()
+    rng = random.Random(seed)
+    memo = FitnessMemo(instance)
 
     # Function to create a random route (permutation)
     def create_random_route():
         route = list(range(n))
-        random.shuffle(route)
+        rng.shuffle(route)
         return route
 
-    # Function to generate a neighbor solution (using swap mutation)
-    def generate_neighbor_solution(base_route):
+    # Function to generate a neighbor solution (using swap mutation) and its memo hash
+    def generate_neighbor_solution(base_route, base_hash):
         neighbor = base_route[:]
+        neighbor_hash = base_hash
         # Perform random swaps to create a neighbor
-        num_swaps = random.randint(1, 3)  # Random number of swaps
+        num_swaps = rng.randint(1, 3)  # Random number of swaps
         for _ in range(num_swaps):
-            i, j = random.sample(range(len(neighbor)), 2)
+            i, j = rng.sample(range(len(neighbor)), 2)
+            neighbor_hash = memo.swap_hash(neighbor_hash, neighbor, i, j)
             neighbor[i], neighbor[j] = neighbor[j], neighbor[i]
-        return neighbor
+        return neighbor, neighbor_hash
+
+    # Cost of a route, looked up if it was scored before. Evaluations cut off
+    # at upper_bound return inf instead of the cost and are not remembered
+    def score(route, route_hash, upper_bound=None):
+        nonlocal evaluations
+        cost = memo.get(route_hash)
+        if cost is None:
+            cost = route_cost(route, instance, upper_bound)
+            evaluations += 1
+            if cost != float('inf'):
+                memo.put(route_hash, cost)
+        return cost
 
     # 2-opt local search to improve a solution
     def two_opt_improvement(route, evals_count):
-        best_route = route[:]
-        best_distance = calculate_route_cost(best_route, locations)["grand_total_cost"]
+        # Keeps prefix times so each 2-opt neighbor is priced incrementally
+        state = RouteState(instance, route)
+        best_distance = state.cost
         nonlocal evaluations
         improved = True
 
         while improved:
             improved = False
-            for i in range(1, len(best_route) - 2):
-                for j in range(i + 1, len(best_route)):
+            for i in range(1, n - 2):
+                for j in range(i + 1, n):
                     if j - i == 1: continue  # No point in swapping adjacent edges
-                    new_route = best_route[:]
-                    new_route[i:j+1] = reversed(new_route[i:j+1])  # 2-opt swap
-
-                    result = calculate_route_cost(new_route, locations)
-                    new_distance = result["grand_total_cost"]
+                    new_distance = state.two_opt_cost(i, j)  # 2-opt swap
                     evaluations += 1
 
-                    if evaluations >= max_evaluations:
-                        return best_route
+                    if evaluations >= max_evaluations or monitor.should_stop(evaluations):
+                        return state.route
 
                     if new_distance < best_distance:
-                        best_route = new_route
-                        best_distance = new_distance
+                        state.apply_two_opt(i, j)
+                        best_distance = state.cost
                         improved = True
                         break  # Break to restart the improvement process with new best
                 if improved:
                     break
-        return best_route
+        return state.route
 
     # Initialize population (food sources)
     population = []
+    hashes = []
     fitnesses = []
     trial_counts = []  # Count of trials without improvement for each solution
 
-    for _ in range(POPULATION_SIZE):
+    for route in seed_routes(initial_routes, POPULATION_SIZE, create_random_route):
         if evaluations >= max_evaluations:
             break
-        route = create_random_route()
+        route_hash = memo.hash_route(route)
         population.append(route)
-        result = calculate_route_cost(route, locations)
-        fitness = result["grand_total_cost"]
-        fitnesses.append(fitness)
+        hashes.append(route_hash)
+        fitnesses.append(score(route, route_hash))
         trial_counts.append(0)
-        evaluations += 1
 
-    if evaluations >= max_evaluations:
-        best_idx = fitnesses.index(min(fitnesses))
+    best_idx = fitnesses.index(min(fitnesses))
+    monitor.improved(population[best_idx], fitnesses[best_idx], evaluations)
+
+    if evaluations >= max_evaluations or monitor.should_stop(evaluations):
         return population[best_idx], evaluations
 
     # ABC main loop
     generation = 0
-    while generation < MAX_GENERATIONS and evaluations < max_evaluations:
+    while generation < MAX_GENERATIONS and evaluations < max_evaluations and not monitor.should_stop(evaluations):
         generation += 1
 
         # Employed bee phase: each bee searches around its food source
-        for i in range(POPULATION_SIZE):
-            if evaluations >= max_evaluations:
+        for i in range(len(population)):
+            if evaluations >= max_evaluations or monitor.should_stop(evaluations):
                 break
 
             # Generate a neighbor solution for employed bee i
-            neighbor = generate_neighbor_solution(population[i])
-            result = calculate_route_cost(neighbor, locations)
-            neighbor_fitness = result["grand_total_cost"]
-            evaluations += 1
+            neighbor, neighbor_hash = generate_neighbor_solution(population[i], hashes[i])
+            neighbor_fitness = score(neighbor, neighbor_hash, fitnesses[i])
 
             # Greedy selection: keep better solution
             if neighbor_fitness < fitnesses[i]:
                 population[i] = neighbor
+                hashes[i] = neighbor_hash
                 fitnesses[i] = neighbor_fitness
                 trial_counts[i] = 0  # Reset trial count
             else:
@@ -117,17 +136,17 @@ def modified_abc(locations: List[Location], max_evaluations: int = 10000) -> tup
 
         if total_fitness == 0:
             # If all solutions have very high cost, assign equal probabilities
-            probabilities = [1.0 / POPULATION_SIZE] * POPULATION_SIZE
+            probabilities = [1.0 / len(population)] * len(population)
         else:
             probabilities = [inv_fit / total_fitness for inv_fit in inverse_fitnesses]
 
         # Onlooker bee phase: probabilistically select food sources and search around them
         for i in range(POPULATION_SIZE):
-            if evaluations >= max_evaluations:
+            if evaluations >= max_evaluations or monitor.should_stop(evaluations):
                 break
 
             # Select a food source using roulette wheel selection
-            rand = random.random()
+            rand = rng.random()
             cumulative_prob = 0.0
             selected_source = 0
             for idx, prob in enumerate(probabilities):
@@ -137,33 +156,36 @@ def modified_abc(locations: List[Location], max_evaluations: int = 10000) -> tup
                     break
 
             # Generate a neighbor solution for the selected food source
-            neighbor = generate_neighbor_solution(population[selected_source])
+            neighbor, _ = generate_neighbor_solution(population[selected_source], hashes[selected_source])
 
             # Apply local search improvement (2-opt)
             improved_neighbor = two_opt_improvement(neighbor, evaluations)
 
-            result = calculate_route_cost(improved_neighbor, locations)
-            neighbor_fitness = result["grand_total_cost"]
-            evaluations += 1
+            neighbor_hash = memo.hash_route(improved_neighbor)
+            neighbor_fitness = score(improved_neighbor, neighbor_hash, fitnesses[selected_source])
 
             # Greedy selection: keep better solution
             if neighbor_fitness < fitnesses[selected_source]:
                 population[selected_source] = improved_neighbor
+                hashes[selected_source] = neighbor_hash
                 fitnesses[selected_source] = neighbor_fitness
                 trial_counts[selected_source] = 0  # Reset trial count
             else:
                 trial_counts[selected_source] += 1  # Increment trial count
 
-        # Scout bee phase: abandon poor solutions and generate new ones
-        for i in range(POPULATION_SIZE):
-            if trial_counts[i] >= LIMIT:
+        # Scout bee phase: abandon poor solutions and generate new ones, never the best one
+        best_source = fitnesses.index(min(fitnesses))
+        for i in range(len(population)):
+            if trial_counts[i] >= LIMIT and i != best_source:
                 # Replace with a new random solution
                 new_route = create_random_route()
                 population[i] = new_route
-                result = calculate_route_cost(new_route, locations)
-                fitnesses[i] = result["grand_total_cost"]
+                hashes[i] = memo.hash_route(new_route)
+                fitnesses[i] = score(new_route, hashes[i])
                 trial_counts[i] = 0
-                evaluations += 1
+
+        best_idx = fitnesses.index(min(fitnesses))
+        monitor.improved(population[best_idx], fitnesses[best_idx], evaluations)
 
     # Find best solution
     best_idx = fitnesses.index(min(fitnesses))
@@ -0,0 +1,131 @@
+"""
+Search monitor shared by all optimization algorithms
+"""
+from typing import Callable, List, Optional
+import math
+import time
+
+
+class SearchMonitor:
+    """
+    Observes a solver run and decides when it ends.
+    Solvers report every new incumbent through improved() and ask should_stop()
+    in their loops. Progress callbacks and cancellation checks are rate limited
+    to check_interval seconds, and new incumbents are forwarded at most every
+    improvement_interval seconds (the latest one is never dropped), so they
+    never slow the solver down.
+
+    A run also stops at the deadline (a time.time() timestamp), after
+    stagnation_evaluations evaluations without a new incumbent, or once an
+    incumbent costs at most target_cost. Exact solvers report proven lower
+    bounds through bounded(), and the run stops once the incumbent is within
+    target_gap of the bound. stop_reason records which one fired.
+    """
+
+    def __init__(self,
+                 should_cancel: Optional[Callable[[], bool]] = None,
+                 on_progress: Optional[Callable[[int, float, List[int]], None]] = None,
+                 on_improvement: Optional[Callable[[List[int], float, int, float], None]] = None,
+                 check_interval: float = 0.1,
+                 improvement_interval: float = 0.1,
+                 deadline: Optional[float] = None,
+                 stagnation_evaluations: Optional[int] = None,
+                 target_cost: Optional[float] = None,
+                 target_gap: Optional[float] = None):
+        self.should_cancel = should_cancel
+        self.on_progress = on_progress
+        self.on_improvement = on_improvement
+        self.check_interval = check_interval
+        self.improvement_interval = improvement_interval
+        self.stagnation_evaluations = stagnation_evaluations
+        self.target_cost = target_cost
+        self.target_gap = target_gap
+
+        self.best_route: Optional[List[int]] = None
+        self.best_cost = float('inf')
+        self.lower_bound: Optional[float] = None
+        self.evaluations = 0
+        self.stop_reason: Optional[str] = None
+        self.started_at = time.monotonic()
+        # The deadline may come from another process, compare it on the monotonic clock
+        self.deadline = self.started_at + (deadline - time.time()) if deadline is not None else math.inf
+        self._last_improvement = 0
+        self._next_check = 0.0
+        self._next_improvement = 0.0
+        self._improvement_pending = False
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.monotonic() - self.started_at) * 1000
+
+    def improved(self, route: List[int], cost: float, evaluations: int):
+        """Record a route if it beats the best one seen so far"""
+        self.evaluations = evaluations
+        if cost < self.best_cost:
+            self.best_cost = cost
+            self.best_route = list(route)
+            self._last_improvement = evaluations
+            if self.target_cost is not None and cost <= self.target_cost:
+                self.stop_reason = "target"
+            self._check_gap()
+            if self.on_improvement is not None:
+                self._improvement_pending = True
+                self._publish_improvement(time.monotonic())
+
+    @property
+    def gap(self) -> Optional[float]:
+        """Relative distance of the incumbent from the proven lower bound, 0 when optimal"""
+        if self.lower_bound is None or not math.isfinite(self.best_cost):
+            return None
+        return max(0.0, self.best_cost - self.lower_bound) / self.best_cost if self.best_cost > 0 else 0.0
+
+    def bounded(self, lower_bound: float):
+        """Record a proven lower bound on the cost of every route"""
+        if self.lower_bound is None or lower_bound > self.lower_bound:
+            self.lower_bound = lower_bound
+            self._check_gap()
+
+    def _check_gap(self):
+        gap = self.gap
+        if self.target_gap is not None and gap is not None and gap <= self.target_gap and self.stop_reason is None:
+            self.stop_reason = "gap"
+
+    def _publish_improvement(self, now: float):
+        if now >= self._next_improvement:
+            self._next_improvement = now + self.improvement_interval
+            self._improvement_pending = False
+            self.on_improvement(self.best_route, self.best_cost, self.evaluations, self.elapsed_ms)
+
+    def flush(self):
+        """Forward an incumbent that is still held back by the rate limit"""
+        if self._improvement_pending:
+            self._next_improvement = 0.0
+            self._publish_improvement(time.monotonic())
+
+    def should_stop(self, evaluations: int) -> bool:
+        """Whether the solver should stop now and return its best route"""
+        self.evaluations = evaluations
+        if self.stop_reason is not None:
+            return True
+
+        if self.stagnation_evaluations is not None and \
+                evaluations - self._last_improvement >= self.stagnation_evaluations:
+            self.stop_reason = "stagnation"
+
+        now = time.monotonic()
+        if now >= self.deadline:
+            self.stop_reason = "deadline"
+        if self._improvement_pending:
+            self._publish_improvement(now)
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            if self.on_progress is not None:
+                self.on_progress(self.evaluations, self.best_cost, self.best_route)
+            if self.should_cancel is not None and self.should_cancel():
+                self.stop_reason = "cancelled"
+
+        return self.stop_reason is not None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.stop_reason == "cancelled"
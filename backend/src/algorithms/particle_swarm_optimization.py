@@ -1,143 +1,127 @@
 """
 Particle Swarm Optimization for warehouse robot route optimization
 """
-from typing import List
-from .utils import Location, calculate_route_cost
-import random
+from typing import List, Optional
+from .instance import ProblemInstance
+from .monitor import SearchMonitor
+from .utils import seed_routes
+from .fitness_memo import FitnessMemo
+from .permutation_ops import apply_swaps, scale_swaps, swap_sequence
+import numpy as np
 
 
-def particle_swarm_optimization(locations: List[Location], max_evaluations: int = 10000) -> tuple:
+def particle_swarm_optimization(instance: ProblemInstance, max_evaluations: int = 10000, monitor: SearchMonitor = None,
+                                initial_routes: List[List[int]] = None, seed: Optional[int] = None) -> tuple:
     """
     Particle Swarm Optimization for TSP optimization
-    Uses particle representation as permutations of location indices
+    Positions are permutations of location indices and velocities are swap
+    sequences: a particle keeps part of its last move and takes a random share
+    of the swaps that lead to its personal best and to the global best
     """
     POPULATION_SIZE = 30
     MAX_ITERATIONS = 1000
+    W = 0.5  # Inertia weight
     C1 = 1.5  # Cognitive parameter
     C2 = 1.5  # Social parameter
+    IDLE_LIMIT = 50  # Iterations in a row without a new position before the search space counts as exhausted
 
-    n = len(locations)
+    n = instance.n
     evaluations = 0
+    monitor = monitor or SearchMonitor()
+    rng = np.random.default_rng(seed)
+    memo = FitnessMemo(instance)
 
     # Function to create a new random route
     def create_random_route():
-        route = list(range(n))
-        random.shuffle(route)
-        return route
+        return rng.permutation(n)
 
-    # Function to calculate fitness (lower is better)
-    def calculate_fitness(route_indices):
+    # Function to calculate fitness of several routes at once (lower is better),
+    # positions visited before are looked up instead of scored again
+    def calculate_fitnesses(routes):
         nonlocal evaluations
-        evaluations += 1
-        result = calculate_route_cost(route_indices, locations)
-        return result["grand_total_cost"]
+        costs, scored = memo.evaluate(routes)
+        evaluations += scored
+        return costs
 
     # Initialize swarm
-    swarm = []
-    fitnesses = []
-
-    for _ in range(POPULATION_SIZE):
-        if evaluations >= max_evaluations:
-            break
-        route = create_random_route()
-        swarm.append(route)
-        fitness = calculate_fitness(route)
-        fitnesses.append(fitness)
+    swarm = [np.asarray(route) for route in
+             seed_routes(initial_routes, min(POPULATION_SIZE, max_evaluations), create_random_route)]
+    velocities = [[] for _ in swarm]
+    fitnesses = calculate_fitnesses(swarm)
 
     # Track personal bests
-    personal_best_positions = [route[:] for route in swarm]
+    personal_best_positions = [route.copy() for route in swarm]
     personal_best_fitnesses = fitnesses[:]
 
     # Find initial global best
     global_best_idx = fitnesses.index(min(fitnesses))
-    global_best_position = swarm[global_best_idx][:]
+    global_best_position = swarm[global_best_idx].copy()
     global_best_fitness = fitnesses[global_best_idx]
+    monitor.improved(global_best_position.tolist(), global_best_fitness, evaluations)
+
+    # Velocity update x' = x + W*v + C1*r1*(pbest - x) + C2*r2*(gbest - x), applied term by term
+    # plus `kicks` random swaps once the swarm stops reaching new positions
+    def move(i, kicks=0):
+        velocity = scale_swaps(velocities[i], W, rng)
+        route = apply_swaps(swarm[i], velocity)
+        for best, weight in ((personal_best_positions[i], C1), (global_best_position, C2)):
+            # Each swap toward the best is kept with probability weight * r / 2
+            swaps = scale_swaps(swap_sequence(route, best), weight * rng.random() / 2, rng)
+            route = apply_swaps(route, swaps)
+            velocity += swaps
+        # A particle sitting on both bests stops moving, keep it exploring with a random swap
+        if not velocity:
+            a, b = rng.choice(n, 2, replace=False)
+            velocity = [(int(a), int(b))]
+            route = apply_swaps(route, velocity)
+        if kicks:
+            swaps = [tuple(pair) for pair in rng.integers(n, size=(kicks, 2)).tolist()]
+            route = apply_swaps(route, swaps)
+            velocity += swaps
+        # Keep velocities at most one full rearrangement long
+        velocities[i] = velocity[-n:]
+        return route
 
     # PSO main loop
     iteration = 0
-    while iteration < MAX_ITERATIONS and evaluations < max_evaluations:
+    kicks = 0
+    idle = 0
+    while iteration < MAX_ITERATIONS and evaluations < max_evaluations and not monitor.should_stop(evaluations):
         iteration += 1
 
-        for i in range(len(swarm)):
-            if evaluations >= max_evaluations:
-                break
-
-            # Update velocity and position for particle i
-            current_route = swarm[i][:]
-
-            # Create new position based on current, personal best, and global best
-            new_route = current_route[:]
-
-            # Apply changes based on personal best
-            for _ in range(int(C1 * random.random())):
-                if evaluations >= max_evaluations:
-                    break
-                if random.random() < 0.5 and len(personal_best_positions[i]) > 1:
-                    # Perform a random swap towards personal best
-                    idx1, idx2 = random.sample(range(len(new_route)), 2)
-                    new_route[idx1], new_route[idx2] = new_route[idx2], new_route[idx1]
-                    evaluations += 1
-
-            # Apply changes based on global best
-            for _ in range(int(C2 * random.random())):
-                if evaluations >= max_evaluations:
-                    break
-                if random.random() < 0.5 and len(global_best_position) > 1:
-                    # Try to incorporate elements from global best
-                    # Find a location in global best and try to move it toward its position
-                    pos_in_global = random.randint(0, len(global_best_position) - 1)
-                    target_location = global_best_position[pos_in_global]
-
-                    # Find where this location currently is in the current route
-                    pos_in_current = new_route.index(target_location)
-
-                    # If not in the right position, try to move it closer
-                    if pos_in_current != pos_in_global and len(new_route) > 1:
-                        # Perform adjacent swap to move element closer to target position
-                        if pos_in_current < pos_in_global:
-                            swap_idx = min(pos_in_current + 1, len(new_route) - 1)
-                        else:
-                            swap_idx = max(pos_in_current - 1, 0)
-                        new_route[pos_in_current], new_route[swap_idx] = new_route[swap_idx], new_route[pos_in_current]
-                        evaluations += 1
-
-            # Ensure the new route is a valid permutation
-            if len(set(new_route)) != len(new_route):
-                # If there are duplicates, fix by creating a random permutation of missing items
-                all_indices = set(range(n))
-                current_indices = set(new_route)
-                missing_indices = list(all_indices - current_indices)
-                extra_indices = []
-
-                # Find duplicate indices
-                seen = set()
-                for idx in new_route:
-                    if idx in seen:
-                        extra_indices.append(idx)
-                    else:
-                        seen.add(idx)
-
-                # Replace extras with missing indices
-                for j in range(len(new_route)):
-                    if new_route[j] in [x for k, x in enumerate(new_route) if k != j]:
-                        if missing_indices:
-                            new_route[j] = missing_indices.pop(0)
-
-            # Calculate fitness of new position
-            new_fitness = calculate_fitness(new_route)
+        # Move every particle first, then score the whole swarm in one batch
+        moved = [move(i, kicks) for i in range(min(len(swarm), max_evaluations - evaluations))]
 
+        # Calculate fitness of the new positions
+        scored_before = evaluations
+        new_fitnesses = calculate_fitnesses(moved)
+
+        for i, (new_route, new_fitness) in enumerate(zip(moved, new_fitnesses)):
             # Update personal best if new position is better
             if new_fitness < personal_best_fitnesses[i]:
-                personal_best_positions[i] = new_route[:]
+                personal_best_positions[i] = new_route
                 personal_best_fitnesses[i] = new_fitness
 
             # Update global best if new position is better
             if new_fitness < global_best_fitness:
-                global_best_position = new_route[:]
+                global_best_position = new_route
                 global_best_fitness = new_fitness
+                monitor.improved(global_best_position.tolist(), global_best_fitness, evaluations)
 
             # Update swarm with new position
-            swarm[i] = new_route[:]
+            swarm[i] = new_route
             fitnesses[i] = new_fitness
 
-    return global_best_position, evaluations
\ No newline at end of file
+        # A converged swarm keeps landing on positions it has seen, which cost nothing and
+        # never end the run: add a random swap per particle while under a tenth of them are
+        # new, and take one away again once over half of them are
+        scored = evaluations - scored_before
+        if 10 * scored < len(moved):
+            kicks += 1
+        elif 2 * scored > len(moved):
+            kicks = max(kicks - 1, 0)
+        idle = 0 if scored else idle + 1
+        if idle >= IDLE_LIMIT:
+            break
+
+    return global_best_position.tolist(), evaluations
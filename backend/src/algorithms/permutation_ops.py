@@ -0,0 +1,158 @@
+"""
+Permutation operators shared by the population-based algorithms
+All operators take routes as integer arrays, return new arrays and run in O(n)
+"""
+from typing import List, Tuple
+import numpy as np
+
+Swap = Tuple[int, int]
+
+
+def _cut_points(n: int, rng: np.random.Generator) -> Tuple[int, int]:
+    """Two distinct positions, smaller first"""
+    a = int(rng.integers(n))
+    b = int(rng.integers(n - 1))
+    if b >= a:
+        b += 1
+    return (a, b) if a < b else (b, a)
+
+
+def order_crossover(parent1: np.ndarray, parent2: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Order Crossover (OX): the child keeps a slice of parent1 in place and fills
+    the other positions, starting after the slice, with the remaining picks in
+    the order they appear in parent2 from the same point on
+    """
+    n = len(parent1)
+    start, end = _cut_points(n, rng)
+
+    taken = np.zeros(n, dtype=bool)
+    taken[parent1[start:end]] = True
+    rotated = np.concatenate((parent2[end:], parent2[:end]))
+
+    child = np.empty_like(parent1)
+    child[start:end] = parent1[start:end]
+    fill = rotated[~taken[rotated]]
+    child[end:] = fill[:n - end]
+    child[:start] = fill[n - end:]
+    return child
+
+
+def partially_mapped_crossover(parent1: np.ndarray, parent2: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Partially Mapped Crossover (PMX): the child is parent2 with a slice of
+    parent1 swapped into place, using a position index instead of searching
+    """
+    n = len(parent1)
+    start, end = _cut_points(n, rng)
+
+    child = parent2.copy()
+    position = np.empty(n, dtype=np.intp)
+    position[child] = np.arange(n)
+    for k in range(start, end):
+        gene = parent1[k]
+        j = position[gene]
+        displaced = child[k]
+        child[k], child[j] = gene, displaced
+        position[gene], position[displaced] = k, j
+    return child
+
+
+def edge_recombination(parent1: np.ndarray, parent2: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Edge Recombination (ERX): builds the child from edges present in either
+    parent, always moving to the neighbour with the fewest edges left, so the
+    child inherits as many parental edges as possible
+    """
+    n = len(parent1)
+    edges = [set() for _ in range(n)]
+    for parent in (parent1.tolist(), parent2.tolist()):
+        for k, gene in enumerate(parent):
+            edges[gene].add(parent[k - 1])
+            edges[gene].add(parent[(k + 1) % n])
+
+    # Unvisited picks with O(1) removal for random restarts
+    pool = list(range(n))
+    pool_index = list(range(n))
+
+    child = np.empty_like(parent1)
+    current = int(parent1[0])
+    for k in range(n):
+        child[k] = current
+        last = pool[-1]
+        pool[pool_index[current]], pool_index[last] = last, pool_index[current]
+        pool.pop()
+        for neighbour in edges[current]:
+            edges[neighbour].discard(current)
+        if not pool:
+            break
+
+        options = edges[current]
+        if options:
+            fewest = min(len(edges[option]) for option in options)
+            best = [option for option in options if len(edges[option]) == fewest]
+            current = best[int(rng.integers(len(best)))]
+        else:
+            current = pool[int(rng.integers(len(pool)))]
+    return child
+
+
+def swap_sequence(source: np.ndarray, target: np.ndarray) -> List[Swap]:
+    """Position swaps that turn source into target, in order"""
+    route = source.copy()
+    position = np.empty(len(route), dtype=np.intp)
+    position[route] = np.arange(len(route))
+    swaps = []
+    for k in np.nonzero(route != target)[0].tolist():
+        if route[k] == target[k]:
+            continue
+        j = int(position[target[k]])
+        swaps.append((k, j))
+        displaced = route[k]
+        route[k], route[j] = target[k], displaced
+        position[displaced] = j
+        position[route[k]] = k
+    return swaps
+
+
+def apply_swaps(route: np.ndarray, swaps: List[Swap]) -> np.ndarray:
+    """Route after applying position swaps in order"""
+    route = route.copy()
+    for i, j in swaps:
+        route[i], route[j] = route[j], route[i]
+    return route
+
+
+def scale_swaps(swaps: List[Swap], factor: float, rng: np.random.Generator) -> List[Swap]:
+    """Keep each swap with probability factor, the discrete analogue of factor * velocity"""
+    if factor >= 1:
+        return list(swaps)
+    keep = rng.random(len(swaps)) < factor
+    return [swap for swap, kept in zip(swaps, keep) if kept]
+
+
+def differential_mutation(base: np.ndarray, donor1: np.ndarray, donor2: np.ndarray, factor: float,
+                          rng: np.random.Generator) -> np.ndarray:
+    """
+    DE mutation base + F * (donor1 - donor2) for permutations: the difference
+    is the swap sequence from donor2 to donor1, scaled by keeping each swap
+    with probability F, so the mutant is always a valid route
+    """
+    return apply_swaps(base, scale_swaps(swap_sequence(donor2, donor1), factor, rng))
+
+
+def swap_crossover(target: np.ndarray, mutant: np.ndarray, rate: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Binomial crossover for permutations: each position takes the mutant's pick
+    with probability rate by swapping it into place, so no repair is needed
+    """
+    trial = target.copy()
+    position = np.empty(len(trial), dtype=np.intp)
+    position[trial] = np.arange(len(trial))
+    for k in np.nonzero(rng.random(len(trial)) < rate)[0].tolist():
+        gene = mutant[k]
+        j = position[gene]
+        displaced = trial[k]
+        trial[k], trial[j] = gene, displaced
+        position[gene], position[displaced] = k, j
+    return trial
@@ -0,0 +1,217 @@
+"""
+Route representation with prefix times and segment aggregates for fast move pricing
+"""
+from typing import List
+import math
+import numpy as np
+from .instance import ProblemInstance
+
+
+def _sparse_table(values: np.ndarray) -> List[np.ndarray]:
+    """Build a range-minimum sparse table, level k covers windows of 2**k positions"""
+    table = [values]
+    width = 1
+    while 2 * width <= len(values):
+        previous = table[-1]
+        table.append(np.minimum(previous[:-width], previous[width:]))
+        width *= 2
+    return table
+
+
+class RouteState:
+    """
+    Route that keeps prefix arrival/departure times and per-segment aggregates.
+
+    The lateness penalty depends on cumulative arrival time, so changing one leg
+    shifts the arrival time of every later pick. A shift of delta changes the
+    penalty of a segment by delta * (sum of rates of late picks in it) as long as
+    no pick crosses its penaltyTime, which is checked with range-minimum queries
+    over the remaining slack. This lets 2-opt, swap and relocate moves be priced
+    by touching only the picks whose order actually changes.
+    """
+
+    def __init__(self, instance: ProblemInstance, route: List[int]):
+        self.instance = instance
+        self.distances = instance.distance_rows
+        self.depot_distances = instance.depot_distance_list
+        self.loading_time = instance.loading_time_list
+        self.penalty_time = instance.penalty_time_list
+        self.penalty_rate = instance.penalty_rate_list
+        self.set_route(route)
+
+    def set_route(self, route: List[int]):
+        """Replace the route and rebuild all prefix data"""
+        self.route = list(route)
+        self._rebuild()
+
+    def _rebuild(self):
+        instance = self.instance
+        route = np.asarray(self.route, dtype=np.intp)
+
+        travel = np.empty(len(route), dtype=np.float64)
+        travel[0] = instance.depot_distances[route[0]]
+        travel[1:] = instance.distances[route[:-1], route[1:]]
+        loading = instance.loading_time[route]
+        departure = np.cumsum(travel + loading)
+        arrival = departure - loading
+
+        rate = instance.penalty_rate[route]
+        slack = instance.penalty_time[route] - arrival
+        late = slack < 0
+        penalty = np.where(late, -slack * rate, 0.0)
+
+        penalty_prefix = np.concatenate(([0.0], np.cumsum(penalty)))
+        late_rate_prefix = np.concatenate(([0.0], np.cumsum(np.where(late, rate, 0.0))))
+        self.arrival = arrival.tolist()
+        self.departure = departure.tolist()
+        self.penalty_prefix = penalty_prefix.tolist()
+        self.late_rate_prefix = late_rate_prefix.tolist()
+
+        # Array copies for pricing many moves at once
+        self._arrays = (route, arrival, departure, penalty_prefix, late_rate_prefix)
+
+        # How much later an on-time pick may arrive before it starts paying a penalty,
+        # and how much earlier a late pick may arrive while it is still late
+        self.delay_slack = _sparse_table(np.where(~late & (rate > 0), slack, math.inf))
+        self.advance_slack = _sparse_table(np.where(late & (rate > 0), -slack, math.inf))
+
+        self.cost = self.departure[-1] + self.depot_distances[self.route[-1]] + self.penalty_prefix[-1]
+
+    @staticmethod
+    def _range_min(table: List[np.ndarray], lo: int, hi: int) -> float:
+        level = (hi - lo + 1).bit_length() - 1
+        row = table[level]
+        return min(row[lo], row[hi - (1 << level) + 1])
+
+    def _shifted_penalty(self, lo: int, hi: int, delta: float) -> float:
+        """Penalty of positions lo..hi when all their arrival times move by delta"""
+        base = self.penalty_prefix[hi + 1] - self.penalty_prefix[lo]
+        if delta == 0:
+            return base
+
+        if delta > 0:
+            unchanged_status = delta <= self._range_min(self.delay_slack, lo, hi)
+        else:
+            unchanged_status = -delta <= self._range_min(self.advance_slack, lo, hi)
+        if unchanged_status:
+            return base + delta * (self.late_rate_prefix[hi + 1] - self.late_rate_prefix[lo])
+
+        # Some pick crosses its penaltyTime, price the segment explicitly
+        total = 0.0
+        for k in range(lo, hi + 1):
+            node = self.route[k]
+            lateness = self.arrival[k] + delta - self.penalty_time[node]
+            if lateness > 0:
+                total += lateness * self.penalty_rate[node]
+        return total
+
+    def _price(self, start: int, pieces: list) -> float:
+        """
+        Cost of the route that keeps positions before start and continues with pieces.
+        A piece is either a list of nodes visited explicitly or a (lo, hi) tuple for
+        an unchanged run of the current route that is only shifted in time.
+        """
+        if start > 0:
+            time = self.departure[start - 1]
+            previous = self.route[start - 1]
+            row = self.distances[previous]
+        else:
+            time = 0.0
+            previous = -1
+            row = self.depot_distances
+        penalty = self.penalty_prefix[start]
+
+        for piece in pieces:
+            if isinstance(piece, tuple):
+                lo, hi = piece
+                if lo > hi:
+                    continue
+                time += row[self.route[lo]]
+                delta = time - self.arrival[lo]
+                penalty += self._shifted_penalty(lo, hi, delta)
+                time = self.departure[hi] + delta
+                previous = self.route[hi]
+                row = self.distances[previous]
+            else:
+                for node in piece:
+                    time += row[node]
+                    if time > self.penalty_time[node]:
+                        penalty += (time - self.penalty_time[node]) * self.penalty_rate[node]
+                    time += self.loading_time[node]
+                    previous = node
+                    row = self.distances[node]
+
+        return_distance = self.depot_distances[previous] if previous >= 0 else 0.0
+        return time + return_distance + penalty
+
+    def two_opt_cost(self, i: int, j: int) -> float:
+        """Cost after reversing positions i..j (i < j)"""
+        return self._price(i, [self.route[j:i - 1 if i > 0 else None:-1], (j + 1, len(self.route) - 1)])
+
+    def swap_cost(self, i: int, j: int) -> float:
+        """Cost after exchanging the picks at positions i and j (i < j)"""
+        route = self.route
+        return self._price(i, [[route[j]], (i + 1, j - 1), [route[i]], (j + 1, len(route) - 1)])
+
+    def relocate_cost(self, i: int, j: int) -> float:
+        """Cost after moving the pick at position i so that it ends up at position j"""
+        last = len(self.route) - 1
+        if i < j:
+            return self._price(i, [(i + 1, j), [self.route[i]], (j + 1, last)])
+        return self._price(j, [[self.route[i]], (j, i - 1), (i + 1, last)])
+
+    def insertion_costs(self, node: int) -> np.ndarray:
+        """
+        Cost after inserting a pick that is not on the route, for every position
+        0..len(route) in one vectorized pass. The picks after the new one are
+        pushed back by delta, priced with the late-rate slope like single moves,
+        and only positions where some of them become late are priced pick by pick.
+        """
+        instance = self.instance
+        route, arrival, departure, penalty_prefix, late_rate_prefix = self._arrays
+        length = len(route)
+
+        # Arrival at the new pick when it is inserted before position j
+        node_arrival = np.concatenate(([0.0], departure))
+        node_arrival[0] += instance.depot_distances[node]
+        node_arrival[1:] += instance.distances[route, node]
+        node_penalty = np.maximum(node_arrival - instance.penalty_time[node], 0.0) * instance.penalty_rate[node]
+        node_departure = node_arrival + instance.loading_time[node]
+
+        delta = node_departure[:-1] + instance.distances[node, route] - arrival
+        suffix_penalty = penalty_prefix[-1] - penalty_prefix[:-1]
+        shifted = suffix_penalty + delta * (late_rate_prefix[-1] - late_rate_prefix[:-1])
+
+        # Smallest slack over each suffix, crossing it changes the penalty slope
+        delay_slack = np.minimum.accumulate(self.delay_slack[0][::-1])[::-1]
+        advance_slack = np.minimum.accumulate(self.advance_slack[0][::-1])[::-1]
+        crossing = np.nonzero((delta > delay_slack) | (-delta > advance_slack))[0]
+        if len(crossing):
+            # Price those suffixes together, a row per position with the picks before it masked out
+            slack = instance.penalty_time[route] - arrival
+            lateness = np.maximum(delta[crossing, None] - slack[None, :], 0.0)
+            lateness[np.arange(length)[None, :] < crossing[:, None]] = 0.0
+            shifted[crossing] = lateness @ instance.penalty_rate[route]
+
+        costs = np.empty(length + 1)
+        costs[:-1] = (departure[-1] + delta + instance.depot_distances[route[-1]]
+                      + penalty_prefix[:-1] + node_penalty[:-1] + shifted)
+        costs[-1] = (node_departure[-1] + instance.depot_distances[node]
+                     + penalty_prefix[-1] + node_penalty[-1])
+        return costs
+
+    def apply_two_opt(self, i: int, j: int):
+        self.route[i:j + 1] = reversed(self.route[i:j + 1])
+        self._rebuild()
+
+    def apply_swap(self, i: int, j: int):
+        self.route[i], self.route[j] = self.route[j], self.route[i]
+        self._rebuild()
+
+    def apply_relocate(self, i: int, j: int):
+        self.route.insert(j, self.route.pop(i))
+        self._rebuild()
+
+    def apply_insert(self, node: int, j: int):
+        self.route.insert(j, node)
+        self._rebuild()
@@ -1,13 +1,16 @@
 """
 Simulated Annealing for warehouse robot route optimization
 """
-from typing import List, Dict
-from .utils import Location, calculate_route_cost
+from typing import List, Dict, Optional
+from .instance import ProblemInstance
+from .monitor import SearchMonitor
+from .route_state import RouteState
 import random
 import math
 
 
-def simulated_annealing(locations: List[Location], max_evaluations: int = 10000) -> tuple:
+def simulated_annealing(instance: ProblemInstance, max_evaluations: int = 10000, monitor: SearchMonitor = None,
+                        initial_routes: List[List[int]] = None, seed: Optional[int] = None) -> tuple:
     """
     Simulated Annealing for TSP optimization
     Uses 2-opt swap for neighborhood generation
@@ -16,43 +19,46 @@ def simulated_annealing(locations: List[Location], max_evaluations: int = 10000)
     COOLING_RATE = 0.995
     MIN_TEMP = 0.1
 
-    n = len(locations)
+    n = instance.n
     evaluations = 0
+    monitor = monitor or SearchMonitor()
+    rng = random.Random(seed)
 
-    # Initialize with random solution
+    # Initialize with the warm-start route or a random solution
     current_route = list(range(n))
-    random.shuffle(current_route)
+    if initial_routes:
+        current_route = list(initial_routes[0])
+    else:
+        rng.shuffle(current_route)
 
-    def cost(route_indices):
-        nonlocal evaluations
-        evaluations += 1
-        result = calculate_route_cost(route_indices, locations)
-        return result["grand_total_cost"]
+    # Keeps prefix times so each 2-opt neighbor is priced incrementally
+    state = RouteState(instance, current_route)
+    evaluations += 1
 
-    current_cost = cost(current_route)
-    best_route = current_route[:]
+    current_cost = state.cost
+    best_route = state.route[:]
     best_cost = current_cost
+    monitor.improved(best_route, best_cost, evaluations)
 
     temperature = INITIAL_TEMP
 
-    while temperature > MIN_TEMP and evaluations < max_evaluations:
+    while temperature > MIN_TEMP and evaluations < max_evaluations and not monitor.should_stop(evaluations):
         # Generate neighbor using 2-opt swap
-        new_route = current_route[:]
-        i, j = sorted(random.sample(range(n), 2))
-        new_route[i:j+1] = reversed(new_route[i:j+1])
-
-        new_cost = cost(new_route)
+        i, j = sorted(rng.sample(range(n), 2))
+        new_cost = state.two_opt_cost(i, j)
+        evaluations += 1
         delta = new_cost - current_cost
 
         # Accept or reject
-        if delta < 0 or random.random() < math.exp(-delta / temperature):
-            current_route = new_route
-            current_cost = new_cost
+        if delta < 0 or rng.random() < math.exp(-delta / temperature):
+            state.apply_two_opt(i, j)
+            current_cost = state.cost
 
             if current_cost < best_cost:
-                best_route = current_route[:]
+                best_route = state.route[:]
                 best_cost = current_cost
+                monitor.improved(best_route, best_cost, evaluations)
 
         temperature *= COOLING_RATE
 
-    return best_route, evaluations
\ No newline at end of file
+    return best_route, evaluations
@@ -0,0 +1,133 @@
+"""
+Grid-bucket spatial index over pick locations for nearest-neighbor and radius queries
+"""
+from typing import List
+import math
+import numpy as np
+
+# Average number of picks per grid cell
+CELL_OCCUPANCY = 16.0
+
+
+class SpatialIndex:
+    """
+    Uniform grid over the pick coordinates, built in O(n log n).
+    Picks are sorted by cell once, so the picks of a row of cells are one
+    contiguous slice, and a query only looks at the ring of cells around its
+    point, widening the ring until no pick outside it can be closer.
+    Nearest-neighbor lists are cached per k.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, occupancy: float = CELL_OCCUPANCY):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.n = len(self.x)
+        self.occupancy = occupancy
+        self._nearest = {}
+
+        self.min_x = float(self.x.min()) if self.n else 0.0
+        self.min_y = float(self.y.min()) if self.n else 0.0
+        width = float(self.x.max()) - self.min_x if self.n else 0.0
+        height = float(self.y.max()) - self.min_y if self.n else 0.0
+
+        # Square cells holding about `occupancy` picks each, never more cells than that along a thin strip
+        target_cells = max(self.n / occupancy, 1.0)
+        self.cell_size = max(math.sqrt(width * height / target_cells), max(width, height) / target_cells)
+        if self.cell_size <= 0:
+            self.cell_size = 1.0
+        self.columns = int(width // self.cell_size) + 1
+        self.rows = int(height // self.cell_size) + 1
+
+        self.column, self.row = self._cell_of(self.x, self.y)
+        cells = self.row * self.columns + self.column
+        self.order = np.argsort(cells, kind="stable")
+        self.starts = np.searchsorted(cells[self.order], np.arange(self.rows * self.columns + 1))
+
+    def _cell_of(self, x, y) -> tuple:
+        column = np.clip(((x - self.min_x) // self.cell_size).astype(np.int64), 0, self.columns - 1)
+        row = np.clip(((y - self.min_y) // self.cell_size).astype(np.int64), 0, self.rows - 1)
+        return column, row
+
+    def _block(self, column: int, row: int, ring: int) -> np.ndarray:
+        """Picks in the cells at most `ring` cells away from (column, row) in both directions"""
+        first_column, last_column = max(column - ring, 0), min(column + ring, self.columns - 1)
+        slices = []
+        for r in range(max(row - ring, 0), min(row + ring, self.rows - 1) + 1):
+            base = r * self.columns
+            slices.append(self.order[self.starts[base + first_column]:self.starts[base + last_column + 1]])
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.intp)
+
+    def _covers_grid(self, column: int, row: int, ring: int) -> bool:
+        return (column - ring <= 0 and row - ring <= 0 and
+                column + ring >= self.columns - 1 and row + ring >= self.rows - 1)
+
+    def _occupied_cells(self):
+        """(column, row, picks) of every non-empty cell"""
+        for cell in np.flatnonzero(np.diff(self.starts)).tolist():
+            row, column = divmod(cell, self.columns)
+            yield column, row, self.order[self.starts[cell]:self.starts[cell + 1]]
+
+    def nearest(self, k: int) -> np.ndarray:
+        """The k closest other picks of every pick, nearest first, as an (n x k) array"""
+        if k in self._nearest:
+            return self._nearest[k]
+
+        result = np.empty((self.n, k), dtype=np.int32)
+        if k == 0:
+            self._nearest[k] = result
+            return result
+        # Ring at which the block around a cell first holds about k picks
+        start_ring = max(1, math.ceil((math.sqrt((k + 1) / self.occupancy) - 1) / 2))
+        for column, row, members in self._occupied_cells():
+            ring = start_ring
+            while True:
+                block = self._block(column, row, ring)
+                whole = self._covers_grid(column, row, ring)
+                if len(block) > k or whole:
+                    dx = self.x[members, None] - self.x[None, block]
+                    dy = self.y[members, None] - self.y[None, block]
+                    distances = np.sqrt(dx * dx + dy * dy)
+                    distances[members[:, None] == block[None, :]] = np.inf
+                    chosen = np.argpartition(distances, k - 1, axis=1)[:, :k]
+                    chosen_distances = np.take_along_axis(distances, chosen, axis=1)
+
+                    # Every pick within ring * cell_size of a member lies inside the block
+                    if whole or chosen_distances.max() <= ring * self.cell_size:
+                        order = np.argsort(chosen_distances, axis=1, kind="stable")
+                        result[members] = block[np.take_along_axis(chosen, order, axis=1)]
+                        break
+                ring += 1
+
+        self._nearest[k] = result
+        return result
+
+    def query_radius(self, x: float, y: float, radius: float) -> np.ndarray:
+        """Picks within radius of the point (x, y), nearest first"""
+        if self.n == 0:
+            return np.empty(0, dtype=np.intp)
+        first_column, first_row = self._cell_of(np.array([x - radius]), np.array([y - radius]))
+        last_column, last_row = self._cell_of(np.array([x + radius]), np.array([y + radius]))
+        slices = []
+        for r in range(int(first_row[0]), int(last_row[0]) + 1):
+            base = r * self.columns
+            slices.append(self.order[self.starts[base + int(first_column[0])]:
+                                     self.starts[base + int(last_column[0]) + 1]])
+        block = np.concatenate(slices)
+        distances = np.hypot(self.x[block] - x, self.y[block] - y)
+        inside = distances <= radius
+        return block[inside][np.argsort(distances[inside], kind="stable")]
+
+    def radius_neighbors(self, radius: float) -> List[np.ndarray]:
+        """For every pick, the other picks within radius of it, nearest first"""
+        neighbors = [None] * self.n
+        ring = max(1, math.ceil(radius / self.cell_size))
+        for column, row, members in self._occupied_cells():
+            block = self._block(column, row, ring)
+            dx = self.x[members, None] - self.x[None, block]
+            dy = self.y[members, None] - self.y[None, block]
+            distances = np.sqrt(dx * dx + dy * dy)
+            distances[members[:, None] == block[None, :]] = np.inf
+            for member, row_distances in zip(members.tolist(), distances):
+                inside = np.flatnonzero(row_distances <= radius)
+                neighbors[member] = block[inside[np.argsort(row_distances[inside], kind="stable")]]
+        return neighbors
@@ -1,109 +1,121 @@
 """
 Tabu Search for warehouse robot route optimization
 """
-from typing import List, Set, Tuple
+from typing import Dict, List, Tuple, Optional
 import random
-from .utils import Location, calculate_route_cost
+from .instance import ProblemInstance
+from .monitor import SearchMonitor
+from .route_state import RouteState
 
+DEPOT = -1
 
-def tabu_search(locations: List[Location], max_evaluations: int = 10000) -> tuple:
+
+def two_opt_edges(route: List[int], i: int, j: int) -> Tuple[tuple, tuple, tuple, tuple]:
+    """
+    Edges removed and added by reversing positions i..j, as undirected node pairs
+    with the depot at both ends of the route
+    """
+    before = route[i - 1] if i > 0 else DEPOT
+    after = route[j + 1] if j + 1 < len(route) else DEPOT
+    first, last = route[i], route[j]
+    return (
+        (min(before, first), max(before, first)),
+        (min(last, after), max(last, after)),
+        (min(before, last), max(before, last)),
+        (min(first, after), max(first, after)),
+    )
+
+
+def tabu_search(instance: ProblemInstance, max_evaluations: int = 10000, monitor: SearchMonitor = None,
+                initial_routes: List[List[int]] = None, seed: Optional[int] = None) -> tuple:
     """
     Tabu Search for TSP optimization
-    Uses a tabu list to prevent cycling and local search
+    Each iteration prices a sample of 2-opt moves incrementally and applies the
+    best admissible one. Edges removed by a move may not be added back for
+    tabu_tenure iterations unless the move beats the best route (aspiration).
     """
-    n = len(locations)
-    evaluations = 0
-
-    # Function to generate neighbor using 2-opt swap
-    def get_neighbor(route: List[int]) -> List[int]:
-        new_route = route[:]
-        i, j = sorted(random.sample(range(len(new_route)), 2))
-        new_route[i:j+1] = reversed(new_route[i:j+1])  # 2-opt swap
-        return new_route
+    CANDIDATES = 50  # 2-opt moves priced per iteration, all of them on small routes
 
-    # Initialize with random solution
+    n = instance.n
+    evaluations = 0
+    monitor = monitor or SearchMonitor()
+    rng = random.Random(seed)
+
+    all_moves = [(i, j) for i in range(n) for j in range(i + 1, n)] if n * (n - 1) // 2 <= CANDIDATES else None
+
+    # Candidate 2-opt reversals of positions i..j, i < j
+    def candidate_moves() -> List[Tuple[int, int]]:
+        if all_moves is not None:
+            return all_moves
+        moves = set()
+        while len(moves) < CANDIDATES:
+            i, j = rng.sample(range(n), 2)
+            moves.add((i, j) if i < j else (j, i))
+        return list(moves)
+
+    # Initialize with the warm-start route or a random solution
     current_route = list(range(n))
-    random.shuffle(current_route)
-
-    current_result = calculate_route_cost(current_route, locations)
-    current_cost = current_result["grand_total_cost"]
+    if initial_routes:
+        current_route = list(initial_routes[0])
+    else:
+        rng.shuffle(current_route)
+
+    # Keeps prefix times so each 2-opt neighbor is priced incrementally
+    state = RouteState(instance, current_route)
+    current_cost = state.cost
     evaluations += 1
 
-    best_route = current_route[:]
+    best_route = state.route[:]
     best_cost = current_cost
+    monitor.improved(best_route, best_cost, evaluations)
 
-    # Tabu list to store recent moves
-    tabu_list: Set[Tuple[int, int]] = set()
+    # Tabu memory: iteration until which an edge may not be added back
+    tabu_until: Dict[tuple, int] = {}
     tabu_tenure = min(10, n // 2)  # Dynamic tenure based on problem size
 
     # Tabu Search main loop
-    iterations = 0
+    iteration = 0
     max_iterations = 2000
-    aspiration_threshold = 0.01  # Accept non-tabu moves if they're significantly better
 
-    while iterations < max_iterations and evaluations < max_evaluations:
-        iterations += 1
+    while iteration < max_iterations and evaluations < max_evaluations and not monitor.should_stop(evaluations):
+        iteration += 1
 
-        # Generate neighbors and find the best non-tabu move
-        best_neighbor = None
+        # Best-improvement over the candidate neighborhood
         best_neighbor_cost = float('inf')
         best_move = None
 
-        # Generate a set of candidate neighbors
-        candidates = []
-        for _ in range(min(50, n * (n - 1) // 2)):  # Limit candidates to avoid too many evaluations
-            neighbor_route = get_neighbor(current_route)
-            i, j = sorted([current_route.index(neighbor_route[k]) for k in range(len(neighbor_route))
-                          if neighbor_route[k] != current_route[k]][:2])
-            move = (min(i, j), max(i, j))
-
-            if move not in tabu_list or current_cost - current_cost * aspiration_threshold > best_neighbor_cost:
-                candidates.append((neighbor_route, move))
-
-        # Evaluate candidates
-        for neighbor_route, move in candidates:
+        for i, j in candidate_moves():
             if evaluations >= max_evaluations:
                 break
 
-            result = calculate_route_cost(neighbor_route, locations)
-            neighbor_cost = result["grand_total_cost"]
+            neighbor_cost = state.two_opt_cost(i, j)
             evaluations += 1
+            if neighbor_cost >= best_neighbor_cost:
+                continue
 
-            # Check if move is tabu and if it satisfies aspiration criteria
-            is_tabu = move in tabu_list
-            aspiration_criteria = neighbor_cost < best_cost
+            # A move is tabu if it restores a recently removed edge, aspiration by objective overrides that
+            _, _, added_first, added_second = two_opt_edges(state.route, i, j)
+            is_tabu = tabu_until.get(added_first, 0) >= iteration or tabu_until.get(added_second, 0) >= iteration
+            if not is_tabu or neighbor_cost < best_cost:
+                best_neighbor_cost = neighbor_cost
+                best_move = (i, j)
 
-            if not is_tabu or aspiration_criteria:
-                if neighbor_cost < best_neighbor_cost:
-                    best_neighbor = neighbor_route
-                    best_neighbor_cost = neighbor_cost
-                    best_move = move
+        # Every candidate was tabu: make a random move to keep going
+        if best_move is None:
+            best_move = tuple(sorted(rng.sample(range(n), 2)))
 
-        if evaluations >= max_evaluations:
-            break
+        # Forbid adding back the edges this move removes
+        removed_first, removed_second, _, _ = two_opt_edges(state.route, *best_move)
+        tabu_until[removed_first] = iteration + tabu_tenure
+        tabu_until[removed_second] = iteration + tabu_tenure
 
-        # If no valid neighbor found, generate a random move
-        if best_neighbor is None:
-            best_neighbor = get_neighbor(current_route)
-            result = calculate_route_cost(best_neighbor, locations)
-            best_neighbor_cost = result["grand_total_cost"]
-            evaluations += 1
-
-        # Update current solution
-        current_route = best_neighbor[:]
-        current_cost = best_neighbor_cost
+        state.apply_two_opt(*best_move)
+        current_cost = state.cost
 
         # Update best solution if improved
         if current_cost < best_cost:
-            best_route = current_route[:]
+            best_route = state.route[:]
             best_cost = current_cost
+            monitor.improved(best_route, best_cost, evaluations)
 
-        # Add move to tabu list
-        if best_move:
-            tabu_list.add(best_move)
-            # Remove oldest moves from tabu list if it exceeds tenure
-            if len(tabu_list) > tabu_tenure:
-                # Remove the oldest entries (simplified by removing random entries)
-                tabu_list = set(list(tabu_list)[-tabu_tenure:])
-
-    return best_route, evaluations
\ No newline at end of file
+    return best_route, evaluations
@@ -1,10 +1,14 @@
 """
 Common utility functions for warehouse robot route optimization algorithms
 """
-from typing import List, Dict
+from typing import List, Dict, Optional, TYPE_CHECKING
 from pydantic import BaseModel, Field
+import numpy as np
 import math
 
+if TYPE_CHECKING:
+    from .instance import ProblemInstance
+
 
 class Location(BaseModel):
     id: str
@@ -32,8 +36,92 @@ def calculate_distance(x1: float, y1: float, x2: float, y2: float) -> float:
     return math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
 
 
-def calculate_route_cost(route_indices: List[int], locations: List[Location]) -> Dict:
+def seed_routes(initial_routes: List[List[int]], size: int, create_route) -> List[List[int]]:
+    """
+    Starting routes of a population: copies of the warm-start routes first,
+    then routes from create_route until there are size of them
+    """
+    routes = [list(route) for route in (initial_routes or [])[:size]]
+    routes += [create_route() for _ in range(size - len(routes))]
+    return routes
+
+
+def spawn_seeds(seed: Optional[int], count: int) -> List[Optional[int]]:
+    """
+    Independent child seeds for runs that execute in parallel, derived from
+    one request seed through numpy's SeedSequence; all None when unseeded
+    """
+    if seed is None:
+        return [None] * count
+    return [int(child.generate_state(1, np.uint64)[0]) for child in np.random.SeedSequence(seed).spawn(count)]
+
+
+def route_cost(route_indices: List[int], instance: "ProblemInstance", upper_bound: float = None) -> float:
+    """
+    Cost-only route evaluation for the solver hot loops.
+    Returns the same grand total cost as calculate_route_cost without building
+    the detailed report. If upper_bound is given, evaluation stops as soon as the
+    partial cost exceeds it and inf is returned instead.
+    """
+    distances = instance.distance_rows
+    depot_distances = instance.depot_distance_list
+    loading_time = instance.loading_time_list
+    penalty_time = instance.penalty_time_list
+    penalty_rate = instance.penalty_rate_list
+    bound = math.inf if upper_bound is None else upper_bound
+
+    cumulative_time = 0.0
+    total_penalty = 0.0
+    row = depot_distances
+    previous = -1
+
+    for idx in route_indices:
+        cumulative_time += row[idx]
+        if cumulative_time > penalty_time[idx]:
+            total_penalty += (cumulative_time - penalty_time[idx]) * penalty_rate[idx]
+        cumulative_time += loading_time[idx]
+        if cumulative_time + total_penalty > bound:
+            return math.inf
+        row = distances[idx]
+        previous = idx
+
+    return_distance = depot_distances[previous] if previous >= 0 else 0.0
+    total_cost = cumulative_time + return_distance + total_penalty
+    return total_cost if total_cost <= bound else math.inf
+
+
+def batch_route_cost(routes: np.ndarray, instance: "ProblemInstance") -> np.ndarray:
+    """
+    Vectorized cost evaluation of a whole population.
+    Takes a (pop_size x n) integer array of routes and returns the grand total
+    cost of every row, computing travel legs, arrival times and penalties with
+    array operations instead of one Python loop per route.
+    """
+    routes = np.asarray(routes, dtype=np.intp)
+    if len(routes) == 0:
+        return np.zeros(0)
+
+    # Travel time of every leg, starting with depot -> first location
+    travel = np.empty(routes.shape, dtype=np.float64)
+    travel[:, 0] = instance.depot_distances[routes[:, 0]]
+    travel[:, 1:] = instance.leg_distances(routes[:, :-1], routes[:, 1:])
+
+    loading = instance.loading_time[routes]
+    departure = np.cumsum(travel + loading, axis=1)
+    arrival = departure - loading
+
+    lateness = np.maximum(arrival - instance.penalty_time[routes], 0.0)
+    total_penalty = (lateness * instance.penalty_rate[routes]).sum(axis=1)
+
+    return_distance = instance.depot_distances[routes[:, -1]]
+    return departure[:, -1] + return_distance + total_penalty
+
+
+def calculate_route_cost(route_indices: List[int], instance: "ProblemInstance") -> Dict:
     """Calculate total cost for a given route including penalties"""
+    locations = instance.locations
+    depot_distances = instance.depot_distance_list
+
     total_distance = 0
     total_loading_time = 0
     total_penalty = 0
@@ -41,12 +129,17 @@ def calculate_route_cost(route_indices: List[int], locations: List[Location]) ->
     coordinates = [[0, 0]]
     location_details = []
 
-    current_x, current_y = 0, 0
+    previous = None
     cumulative_time = 0
 
     for idx in route_indices:
         loc = locations[idx]
-        distance = calculate_distance(current_x, current_y, loc.x, loc.y)
+        if previous is None:
+            distance = depot_distances[idx]
+        else:
+            dx = locations[previous].x - loc.x
+            dy = locations[previous].y - loc.y
+            distance = math.sqrt(dx * dx + dy * dy)
         travel_time = distance  # 1 unit/min
 
         cumulative_time += travel_time
@@ -77,9 +170,9 @@ def calculate_route_cost(route_indices: List[int], locations: List[Location]) ->
             y=loc.y
         ))
 
-        current_x, current_y = loc.x, loc.y
+        previous = idx
 
-    return_distance = calculate_distance(current_x, current_y, 0, 0)
+    return_distance = depot_distances[previous] if previous is not None else 0
     total_distance += return_distance
     coordinates.append([0, 0])
 
@@ -94,4 +187,4 @@ def calculate_route_cost(route_indices: List[int], locations: List[Location]) ->
         "coordinates": coordinates,
         "location_details": location_details,
         "total_time": cumulative_time + return_distance
-    }
\ No newline at end of file
+    }
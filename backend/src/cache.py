@@ -0,0 +1,72 @@
+"""
+Result cache for repeated optimization requests
+"""
+from collections import OrderedDict
+from typing import Optional
+import hashlib
+import json
+import time
+from src.models import OptimizationRequest, OptimizationResponse, CacheStats
+
+
+def cache_key(request: OptimizationRequest) -> str:
+    """
+    Canonical hash of everything that shapes the result. Locations are sorted,
+    so the same pick list submitted in a different order maps to the same key.
+    Picks on a layout are hashed like the locations they resolve to.
+    """
+    if request.pick_table is not None:
+        locations = sorted((pick_id, *row) for pick_id, row in zip(request.pick_ids, request.pick_table.tolist()))
+    else:
+        locations = sorted(
+            (location.id, location.x, location.y, location.loadingTime, location.penaltyTime, location.penaltyRate)
+            for location in request.locations
+        )
+    settings = request.model_dump(exclude={"locations", "layoutId", "picks", "useCache"})
+    settings["algorithm"] = request.algorithm.upper()
+    payload = json.dumps([locations, settings], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of optimization responses. Entries expire after
+    ttl_seconds and the least recently used one is dropped beyond max_entries.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[OptimizationResponse]:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+            del self._entries[key]
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, response: OptimizationResponse):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic(), response.model_copy(update={"cached": True}))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            size=len(self._entries),
+            maxEntries=self.max_entries,
+            ttlSeconds=self.ttl_seconds,
+            hits=self.hits,
+            misses=self.misses
+        )
@@ -0,0 +1,60 @@
+"""
+Island-model genetic algorithm: one population per worker process with periodic migration
+"""
+import asyncio
+from typing import Optional
+from src.models import OptimizationRequest, OptimizationResponse, IslandSettings
+from src.optimizer import run_island
+from src.portfolio import supervise
+
+TOPOLOGIES = ("ring", "complete", "random")
+
+
+def island_settings(request: OptimizationRequest, workers: int) -> IslandSettings:
+    """
+    Validated island settings, one island per worker unless the request sets a
+    count. Islands beyond the workers would only start once others finished and
+    never exchange migrants with them, so there are at most max(2, workers).
+    """
+    settings = request.islands or IslandSettings()
+    if settings.count is None:
+        settings = settings.model_copy(update={"count": max(2, workers)})
+
+    if settings.count < 2:
+        raise ValueError("Island model needs at least 2 islands")
+    if settings.count > max(2, workers):
+        raise ValueError(f"Island model runs at most {max(2, workers)} islands, one per worker")
+    if settings.topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown migration topology: {settings.topology}")
+    if settings.migrationInterval < 1 or settings.migrationSize < 1:
+        raise ValueError("migrationInterval and migrationSize must be positive")
+    return settings
+
+
+async def run_islands(request: OptimizationRequest, pool, manager, workers: int, progress=None,
+                      cancel_event=None, incumbents=None, deadline: Optional[float] = None) -> OptimizationResponse:
+    """
+    Evolve settings.count GA populations in parallel, each with the full
+    evaluation budget. Every migrationInterval generations an island sends its
+    best routes to its neighbours through manager queues. The best route of all
+    islands is returned with the evaluations of all islands combined.
+    """
+    settings = island_settings(request, workers)
+    request = request.model_copy(update={"islands": settings})
+    loop = asyncio.get_running_loop()
+
+    stop_event = manager.Event()
+    inboxes = [manager.Queue() for _ in range(settings.count)]
+    island_progress = [manager.dict() for _ in range(settings.count)] if progress is not None else [None] * settings.count
+    futures = [
+        loop.run_in_executor(pool, run_island, request, k, inboxes, island_progress[k], stop_event, incumbents, deadline)
+        for k in range(settings.count)
+    ]
+
+    await supervise(futures, stop_event, progress, island_progress, cancel_event)
+    results = await asyncio.gather(*futures)
+
+    best = min(results, key=lambda result: result.grandTotalCost)
+    best.evaluationsUsed = sum(result.evaluationsUsed for result in results)
+    best.algorithmUsed = f"Island Genetic Algorithm ({settings.count} islands)"
+    return best
@@ -0,0 +1,95 @@
+"""
+In-process store of asynchronous optimization jobs
+"""
+from collections import OrderedDict
+from typing import Optional
+import asyncio
+import math
+import time
+import uuid
+from src.models import OptimizationRequest, OptimizationResponse, JobStatus
+
+FINISHED_STATES = ("completed", "cancelled", "failed")
+
+
+class Job:
+    """
+    One optimization run. Progress and cancellation are shared with the worker
+    process through a manager dict and event.
+    """
+
+    def __init__(self, request: OptimizationRequest, progress, cancel_event):
+        self.id = uuid.uuid4().hex
+        self.request = request
+        self.progress = progress
+        self.cancel_event = cancel_event
+
+        self.state = "queued"
+        self.result: Optional[OptimizationResponse] = None
+        self.error: Optional[str] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def finish(self, state: str, result: OptimizationResponse = None, error: str = None):
+        self.state = state
+        self.result = result
+        self.error = error
+        self.finished_at = time.monotonic()
+
+    def status(self) -> JobStatus:
+        if self.result is not None:
+            evaluations = self.result.evaluationsUsed
+            best_cost = self.result.grandTotalCost
+        else:
+            progress = dict(self.progress)
+            evaluations = progress.get("evaluations", 0)
+            best_cost = progress.get("best_cost")
+            if best_cost is not None and not math.isfinite(best_cost):
+                best_cost = None
+
+        return JobStatus(
+            jobId=self.id,
+            state=self.state,
+            evaluationsUsed=evaluations,
+            bestCost=round(best_cost, 2) if best_cost is not None else None,
+            result=self.result,
+            error=self.error
+        )
+
+
+class JobStore:
+    """
+    Bounded job registry. Finished jobs are dropped after ttl_seconds, and the
+    oldest finished jobs go first once more than max_jobs are retained.
+    """
+
+    def __init__(self, max_jobs: int = 1000, ttl_seconds: float = 3600):
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    def add(self, job: Job):
+        self._jobs[job.id] = job
+        self._evict()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._evict()
+        return self._jobs.get(job_id)
+
+    def _evict(self):
+        now = time.monotonic()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and now - job.finished_at > self.ttl_seconds]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+        # Running jobs are never dropped, so the store may briefly exceed max_jobs
+        overflow = len(self._jobs) - self.max_jobs
+        if overflow > 0:
+            oldest_finished = [job_id for job_id, job in self._jobs.items() if job.finished][:overflow]
+            for job_id in oldest_finished:
+                del self._jobs[job_id]
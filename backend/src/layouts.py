@@ -0,0 +1,69 @@
+"""
+In-process registry of warehouse layouts that pick requests can reference
+"""
+from typing import Dict, List, Optional
+import itertools
+import numpy as np
+from src.models import OptimizationRequest, LayoutRequest, LayoutInfo
+
+
+class Layout:
+    """Slot coordinates of a warehouse as arrays, with the row of every slot id"""
+
+    def __init__(self, layout_id: str, upload: LayoutRequest, version: int):
+        self.id = layout_id
+        self.version = version
+        self.slot_ids: List[str] = [slot.id for slot in upload.slots]
+        self.rows: Dict[str, int] = {slot_id: i for i, slot_id in enumerate(self.slot_ids)}
+        self.coordinates = np.array([(slot.x, slot.y) for slot in upload.slots], dtype=np.float64)
+
+    def info(self) -> LayoutInfo:
+        return LayoutInfo(layoutId=self.id, slotCount=len(self.slot_ids), version=self.version)
+
+
+class LayoutStore:
+    """Registered layouts by id, every upload gets a new version number"""
+
+    def __init__(self, max_slots: int = 10000):
+        self.max_slots = max_slots
+        self._layouts: Dict[str, Layout] = {}
+        self._versions = itertools.count(1)
+
+    def put(self, layout_id: str, upload: LayoutRequest) -> Layout:
+        if len(upload.slots) > self.max_slots:
+            raise ValueError(f"A layout holds at most {self.max_slots} slots")
+        layout = Layout(layout_id, upload, next(self._versions))
+        if len(layout.rows) != len(layout.slot_ids):
+            raise ValueError("Slot ids must be unique")
+        self._layouts[layout_id] = layout
+        return layout
+
+    def get(self, layout_id: str) -> Optional[Layout]:
+        return self._layouts.get(layout_id)
+
+    def delete(self, layout_id: str) -> Optional[Layout]:
+        return self._layouts.pop(layout_id, None)
+
+
+def resolve_picks(request: OptimizationRequest, layout: Layout) -> OptimizationRequest:
+    """
+    Look up the slots of a request's picks on its layout. The picks become one
+    array row each, and locations are only built in the worker process.
+    """
+    if request.locations:
+        raise ValueError("Send either locations or layoutId with picks, not both")
+
+    picks = request.picks or []
+    rows = np.empty(len(picks), dtype=np.intp)
+    for k, pick in enumerate(picks):
+        row = layout.rows.get(pick.slotId)
+        if row is None:
+            raise ValueError(f"Unknown slot in layout {layout.id}: {pick.slotId}")
+        rows[k] = row
+    if len(np.unique(rows)) != len(rows):
+        raise ValueError("A slot is picked more than once")
+
+    fields = np.array([(pick.loadingTime, pick.penaltyTime, pick.penaltyRate) for pick in picks],
+                      dtype=np.float64).reshape(len(picks), 3)
+    table = np.hstack((layout.coordinates[rows], fields))
+    return request.with_picks([pick.slotId for pick in picks], table)
@@ -0,0 +1,163 @@
+"""
+Request and response models of the optimizer API
+"""
+from typing import Any, List, Dict, Optional
+from pydantic import BaseModel, Field, PrivateAttr
+import numpy as np
+from src.algorithms.utils import Location, LocationDetail
+
+
+class IslandSettings(BaseModel):
+    # Number of populations, defaults to one per worker process
+    count: Optional[int] = None
+    # "ring", "complete" or "random"
+    topology: str = "ring"
+    # Generations between migrations and routes sent per migration
+    migrationInterval: int = 10
+    migrationSize: int = 2
+
+
+class RaceEntry(BaseModel):
+    algorithm: str
+    grandTotalCost: Optional[float] = None
+    evaluationsUsed: int = 0
+    terminationReason: Optional[str] = None
+    error: Optional[str] = None
+
+
+class Slot(BaseModel):
+    id: str
+    x: float = Field(ge=0)
+    y: float = Field(ge=0)
+
+
+class LayoutRequest(BaseModel):
+    slots: List[Slot] = Field(min_length=1)
+
+
+class LayoutInfo(BaseModel):
+    layoutId: str
+    slotCount: int
+    # Increases with every upload
+    version: int
+
+
+class Pick(BaseModel):
+    # Slot of the registered layout, its coordinates come from the layout
+    slotId: str
+    loadingTime: float = Field(gt=0)
+    penaltyTime: float = Field(gt=0)
+    penaltyRate: float = Field(ge=0)
+
+
+class OptimizationRequest(BaseModel):
+    # Either full locations, or layoutId with picks that reference the layout's slots
+    locations: List[Location] = Field(default_factory=list)
+    layoutId: Optional[str] = None
+    picks: Optional[List[Pick]] = None
+    algorithm: str = "GA"
+    # Objective evaluations per solver, the solver default when omitted
+    maxEvaluations: Optional[int] = Field(default=None, gt=0)
+    # Location ids of a previous route to start from; ids no longer in
+    # locations are dropped and new locations are inserted at their cheapest positions
+    initialRoute: Optional[List[str]] = None
+    # Constructive heuristics (NN, EDF, INSERTION, SAVINGS) whose routes seed the solver
+    constructiveSeeds: Optional[List[str]] = None
+    # Set to false to always solve instead of reusing a cached result
+    useCache: bool = True
+    # Set to false to run the requested algorithm even on pick lists small enough to solve exactly
+    autoExact: bool = True
+    # Solvers raced against each other when algorithm is "RACE"
+    algorithms: Optional[List[str]] = None
+    # Stop criteria on top of the budget: wall-clock limit in milliseconds,
+    # evaluations without improvement, and a good-enough grand total cost
+    timeLimitMs: Optional[int] = Field(default=None, gt=0)
+    stagnationEvaluations: Optional[int] = Field(default=None, gt=0)
+    targetCost: Optional[float] = None
+    # Solvers that prove lower bounds (EXACT, BNB) stop once the route is within this relative gap
+    targetGap: Optional[float] = Field(default=None, ge=0)
+    # Wall-clock cap of the BNB tree search in milliseconds, 10 s when omitted
+    treeSearchLimitMs: Optional[int] = Field(default=None, gt=0)
+    # Island model settings when algorithm is "ISLAND"
+    islands: Optional[IslandSettings] = None
+    # Seed for reproducible runs; race members and islands get independent streams derived from it
+    seed: Optional[int] = Field(default=None, ge=0)
+
+    # Picks resolved against their layout: location ids and a (x, y, loadingTime,
+    # penaltyTime, penaltyRate) row per pick, which pickle far cheaper than models
+    _pick_ids: Optional[List[str]] = PrivateAttr(default=None)
+    _pick_table: Optional[np.ndarray] = PrivateAttr(default=None)
+
+    @property
+    def pick_ids(self) -> Optional[List[str]]:
+        return self._pick_ids
+
+    @property
+    def pick_table(self) -> Optional[np.ndarray]:
+        return self._pick_table
+
+    @property
+    def pick_count(self) -> int:
+        return len(self._pick_ids) if self._pick_ids is not None else len(self.locations)
+
+    def with_picks(self, pick_ids: List[str], pick_table: np.ndarray) -> "OptimizationRequest":
+        """Copy of the request with its picks resolved to coordinates"""
+        request = self.model_copy(update={"picks": None})
+        request._pick_ids = pick_ids
+        request._pick_table = pick_table
+        return request
+
+
+class OptimizationResponse(BaseModel):
+    route: List[str]
+    coordinates: List[List[float]]
+    totalDistance: float
+    totalLoadingTime: float
+    totalPenalty: float
+    grandTotalCost: float
+    routeSequence: List[str]
+    penalties: Dict[str, float]
+    algorithmUsed: str
+    locationDetails: List[LocationDetail]
+    evaluationsUsed: int
+    # deadline, stagnation, target, gap, timeLimit, race, cancelled, maxEvaluations or completed
+    terminationReason: Optional[str] = None
+    # Proven lower bound on the grand total cost and the relative gap to it, from EXACT and BNB
+    lowerBound: Optional[float] = None
+    optimalityGap: Optional[float] = None
+    raceResults: Optional[List[RaceEntry]] = None
+    cached: bool = False
+
+
+class BatchRequest(BaseModel):
+    # Optimization requests, each validated on its own so one bad item does not fail the batch
+    requests: List[Any] = Field(min_length=1)
+    # Budget of every item that does not set its own
+    maxEvaluations: Optional[int] = Field(default=None, gt=0)
+    timeLimitMs: Optional[int] = Field(default=None, gt=0)
+
+
+class BatchItemResult(BaseModel):
+    # Position of the item in the batch request
+    index: int
+    # HTTP status the item would have had on its own, with the error detail when it failed
+    status: int = 200
+    result: Optional[OptimizationResponse] = None
+    error: Optional[str] = None
+
+
+class CacheStats(BaseModel):
+    size: int
+    maxEntries: int
+    ttlSeconds: float
+    hits: int
+    misses: int
+
+
+class JobStatus(BaseModel):
+    jobId: str
+    state: str
+    evaluationsUsed: int = 0
+    bestCost: Optional[float] = None
+    result: Optional[OptimizationResponse] = None
+    error: Optional[str] = None
@@ -0,0 +1,241 @@
+"""
+Solver dispatch and response building, executed inside the worker processes
+"""
+import os
+import queue
+import random
+from typing import List, Optional
+import numpy as np
+from src.models import OptimizationRequest, OptimizationResponse
+from src.algorithms.instance import ProblemInstance
+from src.algorithms.monitor import SearchMonitor
+from src.algorithms.utils import Location, calculate_route_cost
+from src.algorithms.utils import batch_route_cost, spawn_seeds
+from src.algorithms.algorithms import genetic_algorithm, simulated_annealing, particle_swarm_optimization, ant_colony_optimization, tabu_search, differential_evolution, artificial_bee_colony, hybrid_aco_tabu, max_min_ant_system, modified_abc, incremental_repair, held_karp, branch_and_bound, CONSTRUCTIVE_HEURISTICS, constructive_solver
+from src.algorithms.constructive import complete_route
+
+# Objective evaluations per solver unless the request sets maxEvaluations
+DEFAULT_MAX_EVALUATIONS = 10000
+
+# Pick lists up to this size are solved exactly unless the request sets autoExact to false
+EXACT_AUTO_MAX_PICKS = 12
+
+# Algorithm code -> (solver, display name)
+ALGORITHMS = {
+    "GA": (genetic_algorithm, "Genetic Algorithm"),
+    "SA": (simulated_annealing, "Simulated Annealing"),
+    "PSO": (particle_swarm_optimization, "Particle Swarm Optimization"),
+    "ACO": (ant_colony_optimization, "Ant Colony Optimization"),
+    "TS": (tabu_search, "Tabu Search"),
+    "TABU": (tabu_search, "Tabu Search"),
+    "DE": (differential_evolution, "Differential Evolution"),
+    "ABC": (artificial_bee_colony, "Artificial Bee Colony"),
+    "MABC": (modified_abc, "Modified Artificial Bee Colony"),
+    "HYBRID": (hybrid_aco_tabu, "Hybrid (ACO + Tabu Search)"),
+    "MMAS": (max_min_ant_system, "MAX-MIN Ant System"),
+    "INCREMENTAL": (incremental_repair, "Incremental Repair"),
+    "EXACT": (held_karp, "Exact (Held-Karp DP)"),
+    "BNB": (branch_and_bound, "Branch and Bound"),
+    "NN": (constructive_solver(CONSTRUCTIVE_HEURISTICS["NN"]), "Nearest Neighbor"),
+    "EDF": (constructive_solver(CONSTRUCTIVE_HEURISTICS["EDF"]), "Earliest Deadline First"),
+    "INSERTION": (constructive_solver(CONSTRUCTIVE_HEURISTICS["INSERTION"]), "Cheapest Insertion"),
+    "SAVINGS": (constructive_solver(CONSTRUCTIVE_HEURISTICS["SAVINGS"]), "Savings"),
+}
+
+
+def warm_up() -> int:
+    """No-op task used to start a worker process and load the solver modules"""
+    return os.getpid()
+
+
+def dispatch_algorithm(request: OptimizationRequest) -> str:
+    """Algorithm that actually runs: small pick lists go to the exact solver, which is faster there"""
+    if request.autoExact and request.pick_count <= EXACT_AUTO_MAX_PICKS:
+        return "EXACT"
+    return request.algorithm
+
+
+def build_instance(request: OptimizationRequest) -> ProblemInstance:
+    """Compile the pick list, turning picks resolved on a layout into locations first"""
+    if request.pick_table is None:
+        return ProblemInstance(request.locations)
+
+    locations = [
+        Location(id=pick_id, x=x, y=y, loadingTime=loading_time, penaltyTime=penalty_time, penaltyRate=penalty_rate)
+        for pick_id, (x, y, loading_time, penalty_time, penalty_rate) in zip(request.pick_ids,
+                                                                             request.pick_table.tolist())
+    ]
+    return ProblemInstance(locations)
+
+
+def build_response(best_route: List[int], instance: ProblemInstance, algorithm_name: str,
+                   evaluations: int, termination_reason: Optional[str] = None,
+                   lower_bound: Optional[float] = None) -> OptimizationResponse:
+    """Calculate final route metrics and build the API response"""
+    result = calculate_route_cost(best_route, instance)
+    cost = result["grand_total_cost"]
+    gap = max(0.0, cost - lower_bound) / cost if lower_bound is not None and cost > 0 else None
+
+    route_ids = [instance.locations[i].id for i in best_route]
+    route_sequence = ["Start (0,0)"] + route_ids + ["Return to Start"]
+
+    return OptimizationResponse(
+        route=route_ids,
+        coordinates=result["coordinates"],
+        totalDistance=round(result["total_distance"], 2),
+        totalLoadingTime=round(result["total_loading_time"], 2),
+        totalPenalty=round(result["total_penalty"], 2),
+        grandTotalCost=round(result["grand_total_cost"], 2),
+        routeSequence=route_sequence,
+        penalties={k: round(v, 2) for k, v in result["penalties"].items()},
+        algorithmUsed=algorithm_name,
+        locationDetails=result["location_details"],
+        evaluationsUsed=evaluations,
+        terminationReason=termination_reason,
+        lowerBound=round(lower_bound, 2) if lower_bound is not None else None,
+        optimalityGap=round(gap, 6) if gap is not None else None
+    )
+
+
+def initial_routes(request: OptimizationRequest, instance: ProblemInstance) -> Optional[List[List[int]]]:
+    """
+    Starting routes for the solver as location indices, cheapest first: the
+    warm-start route, whose removed picks are skipped and missing picks are
+    inserted at their cheapest positions, and the requested constructive seeds
+    """
+    routes = []
+    if request.initialRoute is not None:
+        index_of = {location.id: i for i, location in enumerate(instance.locations)}
+        route = []
+        seen = set()
+        for location_id in request.initialRoute:
+            i = index_of.get(location_id)
+            if i is not None and i not in seen:
+                route.append(i)
+                seen.add(i)
+        routes.append(complete_route(instance, route))
+
+    for code in request.constructiveSeeds or []:
+        routes.append(CONSTRUCTIVE_HEURISTICS[code.upper()](instance))
+
+    if not routes:
+        return None
+    costs = batch_route_cost(np.array(routes), instance).tolist()
+    return [route for _, route in sorted(zip(costs, routes), key=lambda pair: pair[0])]
+
+
+def create_monitor(instance: ProblemInstance, request: OptimizationRequest, deadline: Optional[float] = None,
+                   progress=None, cancel_event=None, incumbents=None) -> SearchMonitor:
+    """
+    Monitor that applies the request's termination settings, mirrors solver
+    progress into a shared dict, polls a shared cancel event and publishes new
+    incumbents to a shared queue, all usually proxies owned by the API process.
+    """
+    def report(evaluations, best_cost, best_route):
+        progress.update(evaluations=evaluations, best_cost=best_cost)
+
+    def publish(route, cost, evaluations, elapsed_ms):
+        incumbents.put({
+            "route": [instance.locations[i].id for i in route],
+            "grandTotalCost": round(cost, 2),
+            "evaluationsUsed": evaluations,
+            "elapsedMs": round(elapsed_ms, 1)
+        })
+
+    return SearchMonitor(
+        should_cancel=cancel_event.is_set if cancel_event is not None else None,
+        on_progress=report if progress is not None else None,
+        on_improvement=publish if incumbents is not None else None,
+        deadline=deadline,
+        stagnation_evaluations=request.stagnationEvaluations,
+        target_cost=request.targetCost,
+        target_gap=request.targetGap
+    )
+
+
+def termination_reason(monitor: SearchMonitor, evaluations: int, max_evaluations: int) -> str:
+    """Why a solver returned: a monitor criterion, the evaluation budget or its own schedule"""
+    if monitor.stop_reason is not None:
+        return monitor.stop_reason
+    if monitor.lower_bound is not None:
+        # Bounding solvers spend the budget on their starting route and then follow their own schedule
+        return "completed"
+    return "maxEvaluations" if evaluations >= max_evaluations else "completed"
+
+
+def run_optimization(request: OptimizationRequest, progress=None, cancel_event=None,
+                     incumbents=None, deadline: Optional[float] = None) -> OptimizationResponse:
+    """
+    Optimize warehouse robot route based on locations and algorithm.
+    Robot travels at 1 unit/min and must return to (0,0).
+    Setting cancel_event or reaching the deadline (a time.time() timestamp)
+    stops the solver early with its best route so far.
+    """
+    # Compile the pick list once and share it with the solver
+    instance = build_instance(request)
+
+    if request.algorithm in ALGORITHMS:
+        solver, algorithm_name = ALGORITHMS[request.algorithm]
+    else:
+        # Default to GA for other algorithms
+        solver, algorithm_name = genetic_algorithm, request.algorithm
+
+    monitor = create_monitor(instance, request, deadline, progress, cancel_event, incumbents)
+    max_evaluations = request.maxEvaluations or DEFAULT_MAX_EVALUATIONS
+    # Solver-specific settings of the request
+    options = {}
+    if solver is branch_and_bound and request.treeSearchLimitMs is not None:
+        options["time_limit"] = request.treeSearchLimitMs / 1000
+    best_route, evaluations = solver(instance, max_evaluations=max_evaluations, monitor=monitor,
+                                     initial_routes=initial_routes(request, instance), seed=request.seed, **options)
+    monitor.flush()
+    return build_response(best_route, instance, algorithm_name, evaluations,
+                          termination_reason(monitor, evaluations, max_evaluations), monitor.lower_bound)
+
+
+def create_migration(island: int, inboxes: list, topology: str, size: int, seed: Optional[int] = None):
+    """
+    Migration hook of one island: sends its best routes to the neighbours given
+    by the topology and collects whatever arrived in its own inbox, without
+    ever waiting for the other islands.
+    """
+    others = [k for k in range(len(inboxes)) if k != island]
+    rng = random.Random(seed)
+
+    def migrate(elites):
+        if topology == "ring":
+            targets = [(island + 1) % len(inboxes)]
+        elif topology == "complete":
+            targets = others
+        else:
+            targets = [rng.choice(others)]
+        for target in targets:
+            inboxes[target].put(elites[:size])
+
+        immigrants = []
+        while True:
+            try:
+                immigrants.extend(inboxes[island].get_nowait())
+            except queue.Empty:
+                return immigrants
+
+    return migrate
+
+
+def run_island(request: OptimizationRequest, island: int, inboxes: list, progress=None, cancel_event=None,
+               incumbents=None, deadline: Optional[float] = None) -> OptimizationResponse:
+    """Evolve one population of an island-model GA, exchanging elites with the other islands"""
+    instance = build_instance(request)
+    settings = request.islands
+    # Every island draws from its own stream of the request seed
+    seed = spawn_seeds(request.seed, settings.count)[island]
+
+    migrate = create_migration(island, inboxes, settings.topology, settings.migrationSize, seed)
+    monitor = create_monitor(instance, request, deadline, progress, cancel_event, incumbents)
+    max_evaluations = request.maxEvaluations or DEFAULT_MAX_EVALUATIONS
+    best_route, evaluations = genetic_algorithm(instance, max_evaluations=max_evaluations, monitor=monitor,
+                                                initial_routes=initial_routes(request, instance), seed=seed,
+                                                migrate=migrate, migration_interval=settings.migrationInterval)
+    monitor.flush()
+    return build_response(best_route, instance, "Island Genetic Algorithm", evaluations,
+                          termination_reason(monitor, evaluations, max_evaluations))
@@ -0,0 +1,122 @@
+"""
+Algorithm portfolio: race several solvers on the same pick list in parallel
+"""
+from typing import Callable, List, Optional
+import asyncio
+import math
+from src.models import OptimizationRequest, OptimizationResponse, RaceEntry
+from src.optimizer import ALGORITHMS, run_optimization
+from src.algorithms.algorithms import EXACT_MAX_PICKS, BNB_MAX_PICKS
+from src.algorithms.utils import spawn_seeds
+
+# Raced when the request does not name its own solvers
+DEFAULT_PORTFOLIO = ["GA", "SA", "TS", "ABC", "HYBRID"]
+
+# How often parallel runs check for cancellation and aggregate member progress
+RACE_POLL_SECONDS = 0.1
+
+
+def race_members(request: OptimizationRequest) -> List[str]:
+    """Validated, de-duplicated algorithm codes of a race"""
+    members = []
+    for code in request.algorithms or DEFAULT_PORTFOLIO:
+        code = code.upper()
+        if code not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm in race: {code}")
+        if code == "EXACT" and request.pick_count > EXACT_MAX_PICKS:
+            raise ValueError(f"EXACT supports at most {EXACT_MAX_PICKS} locations")
+        if code == "BNB" and request.pick_count > BNB_MAX_PICKS:
+            raise ValueError(f"BNB supports at most {BNB_MAX_PICKS} locations")
+        if code not in members:
+            members.append(code)
+    return members
+
+
+async def run_race(request: OptimizationRequest, pool, manager, progress=None, cancel_event=None,
+                   incumbents=None, deadline: Optional[float] = None) -> OptimizationResponse:
+    """
+    Run every member of the portfolio in its own worker process, all sharing
+    the deadline. Members run to the end of their own budget unless one of them
+    converges (see member_converged); then the others are told to stop and
+    return their best route so far with terminationReason "race". The cheapest
+    route wins, members that fail are only listed. Setting cancel_event stops
+    the whole race.
+    """
+    members = race_members(request)
+    loop = asyncio.get_running_loop()
+
+    # One stop flag for all members, set by the race itself and never by a member
+    stop_event = manager.Event()
+    member_progress = [manager.dict() for _ in members] if progress is not None else [None] * len(members)
+    # Each member draws from its own stream of the request seed
+    seeds = spawn_seeds(request.seed, len(members))
+    futures = [
+        loop.run_in_executor(pool, run_optimization, request.model_copy(update={"algorithm": code, "seed": seeds[k]}),
+                             member_progress[k], stop_event, incumbents, deadline)
+        for k, code in enumerate(members)
+    ]
+
+    stopped = await supervise(futures, stop_event, progress, member_progress, cancel_event, converged=member_converged)
+    results = await asyncio.gather(*futures, return_exceptions=True)
+
+    entries = []
+    winner: Optional[OptimizationResponse] = None
+    for code, result in zip(members, results):
+        if isinstance(result, BaseException):
+            entries.append(RaceEntry(algorithm=code, error=str(result)))
+            continue
+        if stopped and result.terminationReason == "cancelled":
+            result.terminationReason = "race"
+        entries.append(RaceEntry(algorithm=code, grandTotalCost=result.grandTotalCost,
+                                 evaluationsUsed=result.evaluationsUsed,
+                                 terminationReason=result.terminationReason))
+        if winner is None or result.grandTotalCost < winner.grandTotalCost:
+            winner = result
+
+    if winner is None:
+        raise RuntimeError("; ".join(f"{entry.algorithm}: {entry.error}" for entry in entries))
+
+    winner.raceResults = entries
+    return winner
+
+
+def member_converged(result: OptimizationResponse) -> bool:
+    """Whether a finished member ends the race: it met the target cost or gap, or proved its route optimal"""
+    return result.terminationReason in ("target", "gap") or result.optimalityGap == 0
+
+
+async def supervise(futures: list, stop_event, progress=None, member_progress=None, cancel_event=None,
+                    converged: Optional[Callable[[OptimizationResponse], bool]] = None) -> bool:
+    """
+    Wait for parallel members, mirroring their combined progress. Once
+    cancel_event is set or a member returns a result that satisfies converged,
+    stop_event tells the remaining members to wrap up; members that fail never
+    stop the others. Returns whether converged stopped them.
+    """
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, timeout=RACE_POLL_SECONDS,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            if progress is not None:
+                report_progress(progress, member_progress)
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            if converged is not None and any(future.exception() is None and converged(future.result())
+                                             for future in done):
+                return bool(pending)
+    finally:
+        # Members finish their current step and hand back their incumbent
+        stop_event.set()
+    return False
+
+
+def report_progress(progress, member_progress):
+    """Mirror the combined progress of all members into the race's progress dict"""
+    evaluations = 0
+    best_cost = math.inf
+    for member in member_progress:
+        snapshot = dict(member)
+        evaluations += snapshot.get("evaluations", 0)
+        best_cost = min(best_cost, snapshot.get("best_cost", math.inf))
+    progress.update(evaluations=evaluations, best_cost=best_cost)
@@ -0,0 +1,38 @@
+"""
+Local-search solvers stop at their evaluation budget and deadline
+"""
+import random
+import time
+import pytest
+from src.algorithms.instance import ProblemInstance
+from src.algorithms.monitor import SearchMonitor
+from src.algorithms.utils import Location
+from src.optimizer import ALGORITHMS
+
+
+def random_instance(n: int, seed: int = 0) -> ProblemInstance:
+    rng = random.Random(seed)
+    return ProblemInstance([
+        Location(id=f"L{i}", x=rng.uniform(0, 100), y=rng.uniform(0, 100), loadingTime=rng.uniform(1, 5),
+                 penaltyTime=rng.uniform(50, 400), penaltyRate=rng.uniform(0, 2))
+        for i in range(n)
+    ])
+
+
+@pytest.mark.parametrize("algorithm", ["HYBRID", "INCREMENTAL"])
+@pytest.mark.parametrize("n, max_evaluations", [(30, 777), (60, 2500), (100, 1000)])
+def test_budget_is_not_exceeded(algorithm, n, max_evaluations):
+    solver = ALGORITHMS[algorithm][0]
+    route, evaluations = solver(random_instance(n), max_evaluations=max_evaluations, seed=1)
+    assert sorted(route) == list(range(n))
+    assert evaluations <= max_evaluations
+
+
+def test_incremental_insertion_stops_at_deadline():
+    instance = random_instance(600)
+    monitor = SearchMonitor(deadline=time.time() + 0.05)
+    started = time.monotonic()
+    route, _ = ALGORITHMS["INCREMENTAL"][0](instance, max_evaluations=10 ** 7, monitor=monitor)
+    assert sorted(route) == list(range(instance.n))
+    assert monitor.stop_reason == "deadline"
+    assert time.monotonic() - started < 1.0
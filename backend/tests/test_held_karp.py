@@ -0,0 +1,34 @@
+"""
+Exact solver against brute force on small pick lists
+"""
+from itertools import permutations
+import random
+import numpy as np
+import pytest
+from src.algorithms.held_karp import held_karp
+from src.algorithms.instance import ProblemInstance
+from src.algorithms.monitor import SearchMonitor
+from src.algorithms.utils import Location, batch_route_cost, route_cost
+
+
+def random_instance(n: int, rng: random.Random) -> ProblemInstance:
+    return ProblemInstance([
+        Location(id=f"L{i}", x=rng.uniform(0, 100), y=rng.uniform(0, 100), loadingTime=rng.uniform(1, 5),
+                 penaltyTime=rng.uniform(50, 400), penaltyRate=rng.uniform(0, 2))
+        for i in range(n)
+    ])
+
+
+@pytest.mark.parametrize("n", range(2, 9))
+@pytest.mark.parametrize("max_evaluations", [1, 50, 10000])
+def test_matches_brute_force(n, max_evaluations):
+    rng = random.Random(n * 1000 + max_evaluations)
+    for _ in range(3):
+        instance = random_instance(n, rng)
+        optimum = float(batch_route_cost(np.array(list(permutations(range(n)))), instance).min())
+
+        monitor = SearchMonitor()
+        route, _ = held_karp(instance, max_evaluations=max_evaluations, monitor=monitor)
+        assert sorted(route) == list(range(n))
+        assert route_cost(route, instance) == pytest.approx(optimum)
+        assert monitor.lower_bound == pytest.approx(optimum)
@@ -0,0 +1,37 @@
+"""
+Distances of large pick lists are priced without the dense distance matrix
+"""
+import random
+import numpy as np
+from src.algorithms.instance import DISTANCE_MATRIX_MAX_PICKS, ProblemInstance
+from src.algorithms.max_min_ant_system import max_min_ant_system
+from src.algorithms.utils import Location, batch_route_cost, calculate_route_cost
+
+
+def random_instance(n: int, seed: int = 0) -> ProblemInstance:
+    rng = random.Random(seed)
+    return ProblemInstance([
+        Location(id=f"L{i}", x=rng.uniform(0, 1000), y=rng.uniform(0, 1000), loadingTime=2.0,
+                 penaltyTime=rng.uniform(100, 5000), penaltyRate=1.0)
+        for i in range(n)
+    ])
+
+
+def test_leg_distances_match_matrix():
+    small = random_instance(50)
+    large = random_instance(DISTANCE_MATRIX_MAX_PICKS + 1)
+    origins = np.arange(50)[:, None]
+    targets = np.arange(50)[None, :]
+    assert np.array_equal(large.leg_distances(origins, targets), large.distances[:50, :50])
+    assert np.array_equal(small.leg_distances(origins, targets), small.distances)
+
+
+def test_mmas_never_builds_distance_matrix_on_large_pick_lists():
+    instance = random_instance(DISTANCE_MATRIX_MAX_PICKS + 1)
+    route, _ = max_min_ant_system(instance, max_evaluations=5, seed=1)
+    assert sorted(route) == list(range(instance.n))
+    assert "distances" not in vars(instance) and "distance_rows" not in vars(instance)
+
+    cost = calculate_route_cost(route, instance)["grand_total_cost"]
+    assert np.isclose(cost, batch_route_cost(np.array([route]), instance)[0])
+    assert "distances" not in vars(instance) and "distance_rows" not in vars(instance)
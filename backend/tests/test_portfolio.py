@@ -0,0 +1,46 @@
+"""
+Race supervision: which finished members stop the others
+"""
+import asyncio
+import threading
+from src.models import OptimizationResponse
+from src.portfolio import member_converged, supervise
+
+
+def response(termination_reason: str, optimality_gap=None) -> OptimizationResponse:
+    return OptimizationResponse(route=[], coordinates=[], totalDistance=0, totalLoadingTime=0, totalPenalty=0,
+                                grandTotalCost=0, routeSequence=[], penalties={}, algorithmUsed="", locationDetails=[],
+                                evaluationsUsed=0, terminationReason=termination_reason, optimalityGap=optimality_gap)
+
+
+async def race(outcomes, timeout=0.5):
+    """Supervise members that finish with the given outcomes, next to one that runs until stopped"""
+    stop_event = threading.Event()
+    loop = asyncio.get_running_loop()
+    futures = [loop.create_future() for _ in outcomes]
+    for future, outcome in zip(futures, outcomes):
+        if isinstance(outcome, BaseException):
+            future.set_exception(outcome)
+        else:
+            future.set_result(outcome)
+
+    async def run_until_stopped():
+        stopped = await asyncio.to_thread(stop_event.wait, timeout)
+        return response("cancelled" if stopped else "maxEvaluations")
+
+    runner = asyncio.ensure_future(run_until_stopped())
+    stopped = await supervise(futures + [runner], stop_event, converged=member_converged)
+    return stopped, (await runner).terminationReason == "cancelled"
+
+
+def test_failed_and_completed_members_do_not_stop_the_race():
+    stopped, runner_stopped = asyncio.run(race([RuntimeError("boom"), response("completed")]))
+    assert not stopped
+    assert not runner_stopped
+
+
+def test_converged_member_stops_the_race():
+    for outcome in (response("target"), response("gap"), response("completed", optimality_gap=0.0)):
+        stopped, runner_stopped = asyncio.run(race([outcome], timeout=5))
+        assert stopped
+        assert runner_stopped
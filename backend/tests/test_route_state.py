@@ -0,0 +1,59 @@
+"""
+Incremental move pricing of RouteState against full route evaluation
+"""
+import random
+import pytest
+from src.algorithms.instance import ProblemInstance
+from src.algorithms.route_state import RouteState
+from src.algorithms.utils import Location, route_cost
+
+
+def random_instance(n: int, rng: random.Random) -> ProblemInstance:
+    # Penalty times spread over the length of a route, so moves push picks across them both ways
+    return ProblemInstance([
+        Location(id=f"L{i}", x=rng.uniform(0, 100), y=rng.uniform(0, 100), loadingTime=rng.uniform(0.5, 5),
+                 penaltyTime=rng.uniform(1, 60 * n), penaltyRate=rng.choice([0.0, rng.uniform(0.1, 3)]))
+        for i in range(n)
+    ])
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_move_costs_match_route_cost(seed):
+    rng = random.Random(seed)
+    n = rng.randint(2, 12)
+    instance = random_instance(n, rng)
+    route = list(range(n))
+    rng.shuffle(route)
+    state = RouteState(instance, route)
+    assert state.cost == pytest.approx(route_cost(route, instance))
+
+    for i in range(n):
+        for j in range(n):
+            if i < j:
+                reversed_route = route[:i] + route[i:j + 1][::-1] + route[j + 1:]
+                assert state.two_opt_cost(i, j) == pytest.approx(route_cost(reversed_route, instance))
+                swapped = route[:]
+                swapped[i], swapped[j] = swapped[j], swapped[i]
+                assert state.swap_cost(i, j) == pytest.approx(route_cost(swapped, instance))
+            if i != j:
+                relocated = route[:]
+                relocated.insert(j, relocated.pop(i))
+                assert state.relocate_cost(i, j) == pytest.approx(route_cost(relocated, instance))
+
+    # Insert a pick that is taken off the route at every position
+    node = route[rng.randrange(n)] if n > 2 else route[-1]
+    partial = [other for other in route if other != node]
+    state = RouteState(instance, partial)
+    costs = state.insertion_costs(node)
+    assert len(costs) == len(partial) + 1
+    for j, cost in enumerate(costs):
+        assert cost == pytest.approx(route_cost(partial[:j] + [node] + partial[j:], instance))
+
+    # Prefix data stays consistent after applying moves
+    state.apply_insert(node, int(rng.randrange(n)))
+    if n > 2:
+        i, j = sorted(rng.sample(range(n), 2))
+        state.apply_two_opt(i, j)
+        state.apply_relocate(j, i)
+        state.apply_swap(i, j)
+    assert state.cost == pytest.approx(route_cost(state.route, instance))
@@ -0,0 +1,55 @@
+"""
+Population-based solvers on tiny budgets and on search spaces they exhaust
+"""
+import pytest
+from src.algorithms.instance import ProblemInstance
+from src.algorithms.monitor import SearchMonitor
+from src.algorithms.utils import Location
+from src.optimizer import ALGORITHMS
+
+POPULATION_SOLVERS = ["GA", "PSO", "DE", "ABC", "MABC"]
+
+
+def make_instance(n: int) -> ProblemInstance:
+    return ProblemInstance([
+        Location(id=f"L{i}", x=float(3 * i % 17), y=float(5 * i % 11), loadingTime=1.0, penaltyTime=50.0,
+                 penaltyRate=1.0)
+        for i in range(n)
+    ])
+
+
+@pytest.mark.parametrize("algorithm", POPULATION_SOLVERS)
+@pytest.mark.parametrize("n, max_evaluations", [(2, 2), (2, 10), (4, 10), (4, 100), (50, 20)])
+def test_small_budget(algorithm, n, max_evaluations):
+    solver = ALGORITHMS[algorithm][0]
+    route, evaluations = solver(make_instance(n), max_evaluations=max_evaluations, seed=1)
+    assert sorted(route) == list(range(n))
+    assert evaluations <= max_evaluations
+
+
+@pytest.mark.parametrize("algorithm", POPULATION_SOLVERS)
+def test_duplicate_seed_routes(algorithm):
+    # Repeated seeds share a memo entry, so fewer evaluations than routes are spent on the population
+    n = 50
+    seed_route = list(range(n))
+    solver = ALGORITHMS[algorithm][0]
+    route, evaluations = solver(make_instance(n), max_evaluations=20, initial_routes=[seed_route, seed_route], seed=1)
+    assert sorted(route) == list(range(n))
+    assert evaluations <= 20
+
+
+@pytest.mark.parametrize("algorithm", ["GA", "PSO", "DE"])
+def test_exhausted_search_space_ends_run(algorithm):
+    # Four picks have 24 routes, once all are known no generation can score anything
+    solver = ALGORITHMS[algorithm][0]
+    route, evaluations = solver(make_instance(4), max_evaluations=10000, seed=1)
+    assert sorted(route) == [0, 1, 2, 3]
+    assert evaluations == 24
+
+
+@pytest.mark.parametrize("algorithm", ["GA", "PSO", "DE"])
+def test_converged_population_reaches_stagnation(algorithm):
+    monitor = SearchMonitor(stagnation_evaluations=300)
+    solver = ALGORITHMS[algorithm][0]
+    solver(make_instance(13), max_evaluations=100000, monitor=monitor, seed=1)
+    assert monitor.stop_reason == "stagnation"